@@ -4,14 +4,19 @@ Backend API Server
 """
 
 import re
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from fastapi import FastAPI, File, UploadFile, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from typing import List, Dict, Any, Optional
+from fastapi.responses import ORJSONResponse
+from typing import List, Dict, Any, Optional, Tuple
 import uvicorn
 import logging
 import os
 from datetime import datetime
+from functools import lru_cache
 from dotenv import load_dotenv
 
 from services.excel_processor import ExcelProcessor
@@ -29,12 +34,15 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="AcuTrace API",
     description="Party Ledger & Fund Flow Intelligence Platform",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Allow all origins for local network deployment
+    # Any http(s) origin for local network deployment; a wildcard list is not
+    # valid alongside credentials, so the origin is matched and echoed instead
+    allow_origin_regex=os.getenv("CORS_ORIGIN_REGEX", r"https?://.*"),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -48,6 +56,118 @@ categorizer = TransactionCategorizer()
 export_service = ExportService()
 
 SUPPORTED_EXTENSIONS = ('.xls', '.xlsx', '.pdf')
+EXCEL_EXTENSIONS = ('.xls', '.xlsx')
+
+# Placeholder parties that do not identify a counterparty
+_GENERIC_PARTIES = frozenset({'DEPOSIT', 'CASH', 'WITHDRAWAL', 'TRANSFER', 'UNKNOWN', ''})
+
+# Bare channel/placeholder narrations that never name a counterparty
+_TRIVIAL_NARRATIONS = frozenset({
+    'CASH', 'DEPOSIT', 'WITHDRAWAL', 'PAYMENT', 'TRANSFER', 'UNKNOWN',
+    'TRF', 'NEFT', 'RTGS', 'IMPS', 'UPI'
+})
+
+# Longer narrations are truncated before pattern matching to bound regex work
+MAX_NARRATION_LENGTH = 512
+
+# Statements at least this large have their enrichment split across worker processes
+PARALLEL_MIN_TRANSACTIONS = 10000
+PARALLEL_CHUNK_SIZE = 2000
+
+# Worker processes per server process; uvicorn runs several server processes,
+# so keep this small rather than one worker per core each
+PROCESS_POOL_WORKERS = int(os.getenv("PROCESS_POOL_WORKERS", min(4, os.cpu_count() or 1)))
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+# Shared pool for blocking file parsing, sized for concurrent multi-file uploads
+_parse_executor = ThreadPoolExecutor(
+    max_workers=min(32, (os.cpu_count() or 4) * 2),
+    thread_name_prefix='acutrace'
+)
+
+
+# ========== NARRATION PATTERNS (compiled once at import) ==========
+_UPI_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in [
+    r'UPI/(?:CR|DR)/\d+/(.+?)/(?:OK|FAIL|PA|BI|AX|PASS)',
+    r'UPI/\d+/(.+?)/(?:OK|FAIL|PA|BI)$',
+    r'UPI-(?:CR|DR)?-?\d*-?(.+?)(?:[-/]OK|[-/]FAIL|[-/]PA|[-/]BI|$)',
+    r'@([a-zA-Z0-9]+)',
+    r'UPI[/\s]*(?:from|to|by)[/\s]*([A-Z][A-Za-z\s]{2,})',
+    r'UPI/(?:D\d+)?[/\s]*([A-Z][A-Za-z\s]{2,})',
+    r'UPI[/\s]*(?:CR|DR)[/\s]*(?:D\d+)?[/\s]*([A-Z][A-Za-z\s]{2,})',
+    r'(?:UPI|PAYTM|GPAY|PHONEPE)[/\s]*(?:CR|DR)?[/\s]*(?:D\d+)?[/\s]*([A-Z][A-Za-z\s]+?)(?:/OKPA|/OKAX|/OKBI|/OK)',
+])
+
+_TRANSFER_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in [
+    r'(?:transfer|TRANSFER)\s+(?:from|to|FROM|TO)\s+([A-Z][A-Za-z\s]{2,})',
+    r'PAID\s+TO\s+([A-Z][A-Za-z\s]{2,})',
+    r'RECEIVED\s+FROM\s+([A-Z][A-Za-z\s]{2,})',
+    r'BY\s+(?:TRANSFER|NEFT|RTGS|IMPS)[:\s-]*([A-Z][A-Za-z\s]{2,})',
+    r'TRF\s+(?:TO|FROM)[:\s]*([A-Z][A-Za-z\s]{2,})',
+])
+
+_OTHER_TRANSFER_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in [
+    r'RTGS\s+(?:CR|DR)?[-]?\s*(?:[A-Z0-9]+[-])?\s*([A-Z][A-Za-z\s]{2,})',
+    r'NEFT\s+(?:CR|DR)?[-]?\s*(?:[A-Z0-9]+[-])?\s*([A-Z][A-Za-z\s]{2,})',
+    r'IMPS\s+(?:CR|DR)?[-]?\s*(?:[A-Z0-9]+[-])?\s*([A-Z][A-Za-z\s]{2,})',
+])
+
+_OTHER_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in [
+    r'CASH\s+(?:DEPOSIT|WITHDRAWAL)\s*(?:AT|BY)?\s*([A-Z][A-Za-z\s]{2,})',
+    r'(?:BILL|EMI|LOAN)\s+(?:PAYMENT|REPAYMENT)[:\s]*([A-Z][A-Za-z\s]{2,})',
+    r'INSURANCE\s+(?:PREMIUM|PAYMENT)[:\s]*([A-Z][A-Za-z\s]{2,})',
+    r'SALARY\s+(?:FROM|TO)?\s*([A-Z][A-Za-z\s]{2,})',
+])
+
+_TO_FROM_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in [
+    r'TO\s+([A-Z][A-Za-z\s]{2,})',
+    r'FOR\s+([A-Z][A-Za-z\s]{2,})',
+    r'FROM\s+([A-Z][A-Za-z\s]{2,})',
+    r'AT\s+([A-Z][A-Za-z\s]{2,})',
+])
+
+_TO_FROM_PREFIX_RE = re.compile(r'^(TO|FROM|FOR|AT|ON|BY|REF|NO|NEW|AC|ACC)\s*')
+
+_SUFFIX_STRIP_RE = re.compile(
+    r'\b(?:TRADERS|TRDG|AGENCIES|SERVICES|PVT|LTD|LIMITED|CORP|INC|COMPANY|HOLDINGS|INDUSTRIES)\b',
+    re.IGNORECASE
+)
+
+_TXN_WORD_STRIP_RE = re.compile(
+    r'\b(?:DEPOSIT|WITHDRAWAL|PAYMENT|TRANSFER|CREDIT|DEBIT|BALANCE|CHARGES|FEE|TAX|EMI|BILL|SALARY|'
+    r'INTEREST|DIVIDEND|REFUND|REVERSAL|CLEARING|NO|NUM|BY|TO|FROM|FOR|AT|ON)\b',
+    re.IGNORECASE
+)
+
+# Literal keywords every pattern in a family requires, mapped to the families
+# they unlock. One scan over the narration finds all of them (overlapping
+# hits included) and only the families present are tried.
+_FAMILY_KEYWORDS = {
+    'UPI': ('upi',), '@': ('upi',), 'PAYTM': ('upi',), 'GPAY': ('upi',), 'PHONEPE': ('upi',),
+    'TRANSFER': ('transfer',), 'PAID': ('transfer',), 'RECEIVED': ('transfer',), 'TRF': ('transfer',),
+    'NEFT': ('transfer', 'other_transfer'), 'RTGS': ('transfer', 'other_transfer'),
+    'IMPS': ('transfer', 'other_transfer'),
+    'CASH': ('other',), 'BILL': ('other',), 'EMI': ('other',), 'LOAN': ('other',),
+    'INSURANCE': ('other',), 'SALARY': ('other',),
+}
+_FAMILY_KEYWORD_RE = re.compile('(?=(' + '|'.join(map(re.escape, _FAMILY_KEYWORDS)) + '))')
+
+# Pattern families in priority order: (family, patterns, rejected candidates,
+# strip leading TO/FROM-style words). A family of None is always tried.
+_PARTY_PATTERN_GROUPS = (
+    ('upi', _UPI_PATTERNS, frozenset({'DR', 'CR', 'TRF', 'BY', 'TO', 'FROM'}), False),
+    ('transfer', _TRANSFER_PATTERNS, frozenset(), False),
+    ('other_transfer', _OTHER_TRANSFER_PATTERNS, frozenset(), False),
+    ('other', _OTHER_PATTERNS, frozenset(), False),
+    (None, _TO_FROM_PATTERNS, frozenset(), True),
+)
+
+# Tokens dropped before taking the meaningful words of a description
+_STOP_TOKENS_RE = re.compile(r'DEPOSIT|PAYMENT|CASH|UTR')
+
+_NONWORD_RE = re.compile(r'[^\w\s]')
+_LONGDIGIT_RE = re.compile(r'\b[\d]{10,}\b')
 
 
 def _extract_party_from_narration(narration: str) -> Optional[str]:
@@ -59,144 +179,248 @@ def _extract_party_from_narration(narration: str) -> Optional[str]:
         return None
     
     narration = narration.upper().strip()
-    party = None
-    
-    # ========== UPI PATTERNS ==========
-    upi_patterns = [
-        r'UPI/(?:CR|DR)/\d+/(.+?)/(?:OK|FAIL|PA|BI|AX|PASS)',
-        r'UPI/\d+/(.+?)/(?:OK|FAIL|PA|BI)$',
-        r'UPI-(?:CR|DR)?-?\d*-?(.+?)(?:[-/]OK|[-/]FAIL|[-/]PA|[-/]BI|$)',
-        r'@([a-zA-Z0-9]+)',
-        r'UPI[/\s]*(?:from|to|by)[/\s]*([A-Z][A-Za-z\s]{2,})',
-        r'UPI/(?:D\d+)?[/\s]*([A-Z][A-Za-z\s]{2,})',
-        r'UPI[/\s]*(?:CR|DR)[/\s]*(?:D\d+)?[/\s]*([A-Z][A-Za-z\s]{2,})',
-        r'(?:UPI|PAYTM|GPAY|PHONEPE)[/\s]*(?:CR|DR)?[/\s]*(?:D\d+)?[/\s]*([A-Z][A-Za-z\s]+?)(?:/OKPA|/OKAX|/OKBI|/OK)',
-    ]
-    
-    for pattern in upi_patterns:
-        match = re.search(pattern, narration, re.IGNORECASE)
-        if match and match.group(1):
-            candidate = match.group(1).upper().strip()
-            candidate = ' '.join(candidate.split())
-            if len(candidate) >= 2 and candidate not in ['DR', 'CR', 'TRF', 'BY', 'TO', 'FROM']:
-                party = candidate
-                break
+    if narration in _TRIVIAL_NARRATIONS:
+        return None
     
-    # ========== TRANSFER PATTERNS ==========
-    if not party:
-        transfer_patterns = [
-            r'(?:transfer|TRANSFER)\s+(?:from|to|FROM|TO)\s+([A-Z][A-Za-z\s]{2,})',
-            r'PAID\s+TO\s+([A-Z][A-Za-z\s]{2,})',
-            r'RECEIVED\s+FROM\s+([A-Z][A-Za-z\s]{2,})',
-            r'BY\s+(?:TRANSFER|NEFT|RTGS|IMPS)[:\s-]*([A-Z][A-Za-z\s]{2,})',
-            r'TRF\s+(?:TO|FROM)[:\s]*([A-Z][A-Za-z\s]{2,})',
-        ]
-        for pattern in transfer_patterns:
-            match = re.search(pattern, narration, re.IGNORECASE)
-            if match and match.group(1):
-                candidate = match.group(1).upper().strip()
-                candidate = ' '.join(candidate.split())
-                if len(candidate) >= 2:
-                    party = candidate
-                    break
+    party = _extract_party_cached(narration[:MAX_NARRATION_LENGTH])
     
-    # ========== RTGS/NEFT/IMPS PATTERNS ==========
-    if not party:
-        other_transfer_patterns = [
-            r'RTGS\s+(?:CR|DR)?[-]?\s*(?:[A-Z0-9]+[-])?\s*([A-Z][A-Za-z\s]{2,})',
-            r'NEFT\s+(?:CR|DR)?[-]?\s*(?:[A-Z0-9]+[-])?\s*([A-Z][A-Za-z\s]{2,})',
-            r'IMPS\s+(?:CR|DR)?[-]?\s*(?:[A-Z0-9]+[-])?\s*([A-Z][A-Za-z\s]{2,})',
-        ]
-        for pattern in other_transfer_patterns:
-            match = re.search(pattern, narration, re.IGNORECASE)
-            if match and match.group(1):
-                candidate = match.group(1).upper().strip()
-                candidate = ' '.join(candidate.split())
-                if len(candidate) >= 2:
-                    party = candidate
-                    break
+    if party:
+        logger.debug("Party extracted from narration: '%s...' -> '%s'", narration[:50], party)
+    else:
+        logger.debug("No party found for narration: '%s...'", narration[:50])
+    return party
+
+
+@lru_cache(maxsize=65536)
+def _extract_party_cached(narration: str) -> Optional[str]:
+    """
+    Pattern-matching core of _extract_party_from_narration.
+    Takes an uppercased, stripped narration (so captures need no further
+    case folding); results are cached because the same narrations recur
+    throughout a statement and the patterns are static.
+    """
+    party = None
     
-    # ========== CASH/BILL PATTERNS ==========
-    if not party:
-        other_patterns = [
-            r'CASH\s+(?:DEPOSIT|WITHDRAWAL)\s*(?:AT|BY)?\s*([A-Z][A-Za-z\s]{2,})',
-            r'(?:BILL|EMI|LOAN)\s+(?:PAYMENT|REPAYMENT)[:\s]*([A-Z][A-Za-z\s]{2,})',
-            r'INSURANCE\s+(?:PREMIUM|PAYMENT)[:\s]*([A-Z][A-Za-z\s]{2,})',
-            r'SALARY\s+(?:FROM|TO)?\s*([A-Z][A-Za-z\s]{2,})',
-        ]
-        for pattern in other_patterns:
-            match = re.search(pattern, narration, re.IGNORECASE)
-            if match and match.group(1):
-                candidate = match.group(1).upper().strip()
-                candidate = ' '.join(candidate.split())
-                if len(candidate) >= 2:
-                    party = candidate
-                    break
+    families = set()
+    for keyword in _FAMILY_KEYWORD_RE.findall(narration):
+        families.update(_FAMILY_KEYWORDS[keyword])
     
-    # ========== TO/FOR/FROM PATTERNS ==========
-    if not party:
-        to_from_patterns = [
-            r'TO\s+([A-Z][A-Za-z\s]{2,})',
-            r'FOR\s+([A-Z][A-Za-z\s]{2,})',
-            r'FROM\s+([A-Z][A-Za-z\s]{2,})',
-            r'AT\s+([A-Z][A-Za-z\s]{2,})',
-        ]
-        for pattern in to_from_patterns:
-            match = re.search(pattern, narration, re.IGNORECASE)
+    # ========== PATTERN FAMILIES, IN PRIORITY ORDER ==========
+    for family, patterns, rejected, strip_prefix in _PARTY_PATTERN_GROUPS:
+        if family is not None and family not in families:
+            continue
+        for pattern in patterns:
+            match = pattern.search(narration)
             if match and match.group(1):
-                candidate = match.group(1).upper().strip()
-                candidate = re.sub(r'^(TO|FROM|FOR|AT|ON|BY|REF|NO|NEW|AC|ACC)\s*', '', candidate)
+                candidate = match.group(1).strip()
+                if strip_prefix:
+                    candidate = _TO_FROM_PREFIX_RE.sub('', candidate)
                 candidate = ' '.join(candidate.split())
-                if len(candidate) >= 2:
+                if len(candidate) >= 2 and candidate not in rejected:
                     party = candidate
                     break
+        if party:
+            break
     
     # ========== NORMALIZE PARTY NAME ==========
     if party:
         # Remove business suffixes
-        suffixes = ['TRADERS', 'TRDG', 'AGENCIES', 'SERVICES', 'PVT', 'LTD', 'LIMITED',
-                   'CORP', 'INC', 'COMPANY', 'HOLDINGS', 'INDUSTRIES']
-        for suffix in suffixes:
-            party = re.sub(rf'\b{suffix}\b', '', party, flags=re.IGNORECASE)
+        party = _SUFFIX_STRIP_RE.sub('', party)
         
         # Remove special characters and digits
-        party = re.sub(r'[^\w\s]', ' ', party)
-        party = re.sub(r'\b[\d]{10,}\b', '', party)
+        party = _NONWORD_RE.sub(' ', party)
+        party = _LONGDIGIT_RE.sub('', party)
         
         # Clean up
         party = ' '.join(party.split())
-        party = party.strip()
         
         if len(party) >= 2:
-            logger.debug(f"Party extracted from narration: '{narration[:50]}...' -> '{party}'")
             return party
     
     # ========== LAST RESORT: Extract meaningful words ==========
     if not party:
-        transaction_words = ['DEPOSIT', 'WITHDRAWAL', 'PAYMENT', 'TRANSFER', 'CREDIT', 'DEBIT',
-                           'BALANCE', 'CHARGES', 'FEE', 'TAX', 'EMI', 'BILL', 'SALARY',
-                           'INTEREST', 'DIVIDEND', 'REFUND', 'REVERSAL', 'CLEARING', 'NO', 'NUM',
-                           'BY', 'TO', 'FROM', 'FOR', 'AT', 'ON']
-        cleaned = narration
-        for word in transaction_words:
-            cleaned = re.sub(r'\b' + word + r'\b', ' ', cleaned, flags=re.IGNORECASE)
-        
-        words = cleaned.strip().split()
+        cleaned = _TXN_WORD_STRIP_RE.sub(' ', narration)
+        
+        words = cleaned.split()
         meaningful = [w for w in words if len(w) > 2 and not w.isdigit()]
         
         if meaningful:
-            party = ' '.join(meaningful[:3]).upper()
+            party = ' '.join(meaningful[:3])
             # Clean up
-            party = re.sub(r'[^\w\s]', ' ', party)
+            party = _NONWORD_RE.sub(' ', party)
             party = ' '.join(party.split())
             if len(party) >= 2:
-                logger.debug(f"Party extracted (fallback): '{narration[:50]}...' -> '{party}'")
                 return party
     
-    logger.debug(f"No party found for narration: '{narration[:50]}...'")
     return None
 
 
+def _resolve_fallback_party(description: str) -> Optional[str]:
+    """
+    Resolve a party for a transaction the processor could not attribute.
+    Tries narration pattern matching first, then the meaningful words of the description.
+    """
+    party = _extract_party_from_narration(description)
+    if party:
+        return party
+    
+    # Last resort: extract meaningful words from description
+    words = _STOP_TOKENS_RE.sub('', description).split()
+    meaningful = [w for w in words if len(w) > 2 and not w.isdigit()]
+    if meaningful:
+        return ' '.join(meaningful[:3]).upper()
+    
+    return None
+
+
+def _upload_size(file: UploadFile) -> int:
+    """
+    Size of an upload in bytes. Starlette already spools uploads to a temporary
+    file, so this seeks that file instead of reading the payload into memory.
+    """
+    file.file.seek(0, os.SEEK_END)
+    size = file.file.tell()
+    file.file.seek(0)
+    return size
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """
+    Create the worker pool for large statements on first use, and again after a
+    worker died (a broken pool rejects every later submit).
+    Workers come from a forkserver: forking this multi-threaded server directly
+    could hand children locks held by other threads (e.g. logging's).
+    """
+    global _process_pool
+    if _process_pool is None or getattr(_process_pool, '_broken', False):
+        _reset_process_pool()
+        _process_pool = ProcessPoolExecutor(
+            max_workers=PROCESS_POOL_WORKERS,
+            mp_context=multiprocessing.get_context('forkserver')
+        )
+    return _process_pool
+
+
+def _reset_process_pool() -> None:
+    """Drop the current pool so the next _get_process_pool builds a fresh one."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False)
+        _process_pool = None
+
+
+def _sheet_pool() -> Optional[ProcessPoolExecutor]:
+    """Pool for extracting workbook sheets or PDF pages in parallel; None on a single core."""
+    return _get_process_pool() if (os.cpu_count() or 1) > 1 else None
+
+
+def _enrich_chunk(transactions: List[Dict[str, Any]], offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Fill missing amounts, resolve fallback parties and categorize a batch of
+    transactions in place. Touches no shared state, so it can run in a worker
+    process. Returns the batch and how many parties came from fallback extraction.
+    """
+    fallback_count = 0
+    fallback_parties: Dict[str, Optional[str]] = {}
+    
+    for idx, txn in enumerate(transactions, start=offset):
+        try:
+            # Calculate amount if not set
+            if txn.get('amount', 0) == 0:
+                txn['amount'] = (txn.get('credit', 0) or 0) - (txn.get('debit', 0) or 0)
+            
+            # Get existing party from processor; only generic ones need fallback
+            existing_party = txn.get('detected_party') or txn.get('party')
+            if not existing_party or existing_party in _GENERIC_PARTIES:
+                description = txn.get('description', '')
+                if description not in fallback_parties:
+                    fallback_parties[description] = _resolve_fallback_party(description)
+                fallback_party = fallback_parties[description]
+                if fallback_party:
+                    txn['detected_party'] = fallback_party
+                    txn['party'] = fallback_party
+                    fallback_count += 1
+            
+            # Categorize transaction (includes IMPS, RTGS)
+            category_data = categorizer.categorize_transaction(txn)
+            txn.update(category_data)
+            
+        except Exception as e:
+            logger.warning(f"Error processing transaction {idx}: {str(e)}")
+            continue
+    
+    return transactions, fallback_count
+
+
+async def _process_transactions(transactions: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Resolve parties, register them with the entity normalizer and categorize
+    every transaction in place. Returns party extraction stats.
+    Large statements are enriched in chunks on a process pool; entity
+    registration mutates the shared normalizer and stays in this process.
+    """
+    party_extraction_stats = {'total': len(transactions), 'found': 0, 'fallback': 0}
+    
+    results = None
+    if len(transactions) >= PARALLEL_MIN_TRANSACTIONS:
+        loop = asyncio.get_running_loop()
+        pool = _get_process_pool()
+        try:
+            results = await asyncio.gather(*[
+                loop.run_in_executor(pool, _enrich_chunk, transactions[start:start + PARALLEL_CHUNK_SIZE], start)
+                for start in range(0, len(transactions), PARALLEL_CHUNK_SIZE)
+            ])
+        except BrokenProcessPool as e:
+            # Workers only got copies, so the batch is untouched; redo it here
+            logger.warning(f"Process pool failed, enriching in-process: {str(e)}")
+            _reset_process_pool()
+    
+    if results is not None:
+        transactions[:] = [txn for chunk, _ in results for txn in chunk]
+        party_extraction_stats['fallback'] = sum(count for _, count in results)
+    else:
+        _, party_extraction_stats['fallback'] = _enrich_chunk(transactions)
+    
+    # Collect registrations first, then hand them to the entity normalizer in one batch
+    records = []
+    registered_txns = []
+    for idx, txn in enumerate(transactions):
+        try:
+            party_to_register = txn.get('detected_party') or txn.get('party')
+            if party_to_register and party_to_register not in _GENERIC_PARTIES:
+                records.append((
+                    txn.get('description', ''),
+                    float(txn.get('amount', 0) or 0),
+                    txn.get('credit', 0) > 0,
+                    party_to_register
+                ))
+                registered_txns.append(txn)
+        except Exception as e:
+            logger.warning(f"Error registering party for transaction {idx}: {str(e)}")
+            continue
+    
+    party_extraction_stats['found'] = len(records)
+    
+    # Stamp each transaction with the normalized name it was registered under
+    for txn, registered_party in zip(registered_txns, entity_normalizer.bulk_register(records)):
+        if registered_party:
+            txn['party'] = registered_party
+            txn['detected_party'] = registered_party
+    
+    return party_extraction_stats
+
+
+@app.on_event("startup")
+async def configure_executor():
+    asyncio.get_running_loop().set_default_executor(_parse_executor)
+
+
+@app.on_event("shutdown")
+def shutdown_executors():
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+    _parse_executor.shutdown(wait=False, cancel_futures=True)
+
 @app.get("/")
 async def root():
     return {"message": "AcuTrace API", "status": "operational", "version": "1.0.0"}
@@ -209,22 +433,30 @@ async def health_check():
 async def analyze_statement(file: UploadFile = File(...)):
     """Analyze a single bank statement for party ledger and fund flow intelligence."""
     try:
-        if not file.filename.lower().endswith(SUPPORTED_EXTENSIONS):
+        ext = os.path.splitext(file.filename)[1].lower()
+        if ext not in SUPPORTED_EXTENSIONS:
             raise HTTPException(status_code=400, detail=f"Only {', '.join(SUPPORTED_EXTENSIONS)} files are supported")
         
         logger.info(f"Processing file: {file.filename}")
         
-        file_bytes = await file.read()
-        if len(file_bytes) == 0:
+        if _upload_size(file) == 0:
             raise HTTPException(status_code=400, detail="Empty file")
         
         transactions = []
         account_profile = {}
+        # Parsing is CPU-bound; run it off the event loop so other requests are served meanwhile
+        loop = asyncio.get_running_loop()
         
-        if file.filename.lower().endswith(('.xls', '.xlsx')):
+        if ext in EXCEL_EXTENSIONS:
             logger.info("Extracting transactions from Excel...")
             try:
-                result = excel_processor.extract_transactions(file_bytes, file.filename)
+                result = await loop.run_in_executor(
+                    _parse_executor,
+                    excel_processor.extract_transactions,
+                    file.file,
+                    file.filename,
+                    _sheet_pool()
+                )
                 
                 if isinstance(result, tuple) and len(result) == 2:
                     transactions, account_profile = result
@@ -237,10 +469,12 @@ async def analyze_statement(file: UploadFile = File(...)):
                 logger.error(f"Excel extraction error: {str(e)}")
                 raise HTTPException(status_code=400, detail=f"Failed to process Excel file: {str(e)}")
         
-        elif file.filename.lower().endswith('.pdf'):
+        elif ext == '.pdf':
             logger.info("Extracting transactions from PDF...")
             try:
-                transactions = pdf_processor.extract_transactions(file_bytes)
+                transactions = await loop.run_in_executor(
+                    _parse_executor, pdf_processor.extract_transactions, file.file, _sheet_pool()
+                )
                 logger.info(f"PDF extraction returned {len(transactions)} transactions")
                 
                 if not transactions:
@@ -249,6 +483,9 @@ async def analyze_statement(file: UploadFile = File(...)):
                 logger.error(f"PDF extraction error: {str(e)}")
                 raise HTTPException(status_code=400, detail=f"Failed to process PDF file: {str(e)}")
         
+        # The raw upload is no longer needed; free its spooled buffer before enrichment
+        await file.close()
+        
         if not transactions or len(transactions) == 0:
             logger.warning(f"No transactions found in {file.filename}")
             raise HTTPException(status_code=400, detail="No transactions found. Please ensure the file contains valid bank statement data.")
@@ -260,63 +497,7 @@ async def analyze_statement(file: UploadFile = File(...)):
         fund_flow_builder.clear()
         
         # Process each transaction - REGISTER PARTIES WITH ENTITY NORMALIZER
-        party_extraction_stats = {'total': len(transactions), 'found': 0, 'fallback': 0}
-        
-        for idx, txn in enumerate(transactions):
-            try:
-                # Calculate amount if not set
-                if txn.get('amount', 0) == 0:
-                    txn['amount'] = (txn.get('credit', 0) or 0) - (txn.get('debit', 0) or 0)
-                
-                # Get existing party from processor
-                existing_party = txn.get('detected_party') or txn.get('party')
-                description = txn.get('description', '')
-                is_credit = txn.get('credit', 0) > 0
-                amount = txn.get('amount', 0)
-                
-                # If party already exists from processor, use it directly
-                party_to_register = existing_party
-                
-                if not party_to_register or party_to_register in ['DEPOSIT', 'CASH', 'WITHDRAWAL', 'TRANSFER', 'UNKNOWN', '']:
-                    # Try fallback extraction
-                    fallback_party = _extract_party_from_narration(description)
-                    if fallback_party:
-                        party_to_register = fallback_party
-                        txn['detected_party'] = fallback_party
-                        txn['party'] = fallback_party
-                        party_extraction_stats['fallback'] += 1
-                    else:
-                        # Last resort: extract meaningful words from description
-                        words = description.replace('DEPOSIT', '').replace('PAYMENT', '').replace('CASH', '').replace('UTR', '').strip().split()
-                        meaningful = [w for w in words if len(w) > 2 and not w.isdigit()]
-                        if meaningful:
-                            party_to_register = ' '.join(meaningful[:3]).upper()
-                            txn['detected_party'] = party_to_register
-                            txn['party'] = party_to_register
-                            party_extraction_stats['fallback'] += 1
-                
-                if party_to_register and party_to_register not in ['DEPOSIT', 'CASH', 'WITHDRAWAL', 'TRANSFER', 'UNKNOWN', '']:
-                    party_extraction_stats['found'] += 1
-                    # Register party with entity_normalizer
-                    entity_normalizer.extract_entity(
-                        description,
-                        amount,
-                        is_credit=is_credit
-                    )
-                    # Get the registered party name (normalized)
-                    registered_party = entity_normalizer._normalize_name(party_to_register)
-                    if registered_party and registered_party in entity_normalizer.entities:
-                        txn['party'] = registered_party
-                        txn['detected_party'] = registered_party
-                    logger.debug(f"Registered party: {party_to_register}")
-                
-                # Categorize transaction (includes IMPS, RTGS)
-                category_data = categorizer.categorize_transaction(txn)
-                txn.update(category_data)
-                
-            except Exception as e:
-                logger.warning(f"Error processing transaction {idx}: {str(e)}")
-                continue
+        party_extraction_stats = await _process_transactions(transactions)
         
         logger.info(f"Party extraction stats: {party_extraction_stats}")
         
@@ -335,7 +516,7 @@ async def analyze_statement(file: UploadFile = File(...)):
         fund_flow_chains = fund_flow_builder.get_chain_summary()
         entity_relations = entity_normalizer.get_entity_relation_index()
         
-        source_type = "pdf" if file.filename.lower().endswith('.pdf') else "xls"
+        source_type = "pdf" if ext == '.pdf' else "xls"
         
         response_data = {
             "status": "success",
@@ -359,7 +540,7 @@ async def analyze_statement(file: UploadFile = File(...)):
         
         logger.info(f"Analysis complete. Found {len(party_ledger)} parties, {fund_flow_chains.get('total_chains', 0)} fund flow chains")
         
-        return JSONResponse(content=response_data)
+        return ORJSONResponse(content=response_data)
         
     except HTTPException:
         raise
@@ -376,27 +557,26 @@ async def analyze_multiple_statements(files: List[UploadFile] = File(...)):
         
         logger.info(f"Processing {len(files)} files simultaneously...")
         
-        import asyncio
-        
         async def process_file(file: UploadFile):
             try:
-                if not file.filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                ext = os.path.splitext(file.filename)[1].lower()
+                if ext not in SUPPORTED_EXTENSIONS:
                     return None, None, {}
                 
-                file_bytes = await file.read()
-                if len(file_bytes) == 0:
+                if _upload_size(file) == 0:
                     return None, None, {}
                 
                 transactions = []
                 account_profile = {}
+                loop = asyncio.get_running_loop()
                 
-                if file.filename.lower().endswith(('.xls', '.xlsx')):
-                    loop = asyncio.get_event_loop()
+                if ext in EXCEL_EXTENSIONS:
                     result = await loop.run_in_executor(
-                        None, 
+                        _parse_executor, 
                         excel_processor.extract_transactions, 
-                        file_bytes,
-                        file.filename
+                        file.file,
+                        file.filename,
+                        _sheet_pool()
                     )
                     
                     if isinstance(result, tuple) and len(result) == 2:
@@ -405,8 +585,16 @@ async def analyze_multiple_statements(files: List[UploadFile] = File(...)):
                         transactions = result if isinstance(result, list) else []
                         account_profile = {}
                 
-                elif file.filename.lower().endswith('.pdf'):
-                    transactions = pdf_processor.extract_transactions(file_bytes)
+                elif ext == '.pdf':
+                    transactions = await loop.run_in_executor(
+                        _parse_executor,
+                        pdf_processor.extract_transactions,
+                        file.file,
+                        _sheet_pool()
+                    )
+                
+                # Free the spooled upload now rather than after every file has been processed
+                await file.close()
                 
                 if not transactions or len(transactions) == 0:
                     return None, None, {}
@@ -416,7 +604,7 @@ async def analyze_multiple_statements(files: List[UploadFile] = File(...)):
                 
                 metadata = {
                     "filename": file.filename,
-                    "file_type": "pdf" if file.filename.lower().endswith('.pdf') else "xls",
+                    "file_type": "pdf" if ext == '.pdf' else "xls",
                     "transaction_count": len(transactions)
                 }
                 
@@ -454,54 +642,7 @@ async def analyze_multiple_statements(files: List[UploadFile] = File(...)):
         entity_normalizer.clear()
         fund_flow_builder.clear()
         
-        party_extraction_stats = {'total': len(all_transactions), 'found': 0, 'fallback': 0}
-        
-        for txn in all_transactions:
-            if txn.get('amount', 0) == 0:
-                txn['amount'] = (txn.get('credit', 0) or 0) - (txn.get('debit', 0) or 0)
-            
-            existing_party = txn.get('detected_party') or txn.get('party')
-            description = txn.get('description', '')
-            is_credit = txn.get('credit', 0) > 0
-            amount = txn.get('amount', 0)
-            
-            # If party already exists from processor, use it directly
-            party_to_register = existing_party
-            
-            if not party_to_register or party_to_register in ['DEPOSIT', 'CASH', 'WITHDRAWAL', 'TRANSFER', 'UNKNOWN', '']:
-                # Try fallback extraction
-                fallback_party = _extract_party_from_narration(description)
-                if fallback_party:
-                    party_to_register = fallback_party
-                    txn['detected_party'] = fallback_party
-                    txn['party'] = fallback_party
-                    party_extraction_stats['fallback'] += 1
-                else:
-                    # Last resort: extract meaningful words from description
-                    words = description.replace('DEPOSIT', '').replace('PAYMENT', '').replace('CASH', '').replace('UTR', '').strip().split()
-                    meaningful = [w for w in words if len(w) > 2 and not w.isdigit()]
-                    if meaningful:
-                        party_to_register = ' '.join(meaningful[:3]).upper()
-                        txn['detected_party'] = party_to_register
-                        txn['party'] = party_to_register
-                        party_extraction_stats['fallback'] += 1
-            
-            if party_to_register and party_to_register not in ['DEPOSIT', 'CASH', 'WITHDRAWAL', 'TRANSFER', 'UNKNOWN', '']:
-                party_extraction_stats['found'] += 1
-                # Register party with entity_normalizer
-                entity_normalizer.extract_entity(
-                    description,
-                    amount,
-                    is_credit=is_credit
-                )
-                # Get the registered party name (normalized)
-                registered_party = entity_normalizer._normalize_name(party_to_register)
-                if registered_party and registered_party in entity_normalizer.entities:
-                    txn['party'] = registered_party
-                    txn['detected_party'] = registered_party
-            
-            category_data = categorizer.categorize_transaction(txn)
-            txn.update(category_data)
+        party_extraction_stats = await _process_transactions(all_transactions)
         
         logger.info(f"Party extraction stats (multi-file): {party_extraction_stats}")
         
@@ -538,7 +679,7 @@ async def analyze_multiple_statements(files: List[UploadFile] = File(...)):
         
         logger.info(f"Analysis complete. Found {len(party_ledger)} parties")
         
-        return JSONResponse(content=response_data)
+        return ORJSONResponse(content=response_data)
         
     except HTTPException:
         raise
@@ -557,7 +698,7 @@ async def get_party_details(party_name: str):
         entity_data = entity_normalizer.entities[normalized]
         money_paths = fund_flow_builder.get_money_path_by_party(party_name)
         
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "status": "success",
             "party": {
                 "name": normalized,
@@ -580,7 +721,7 @@ async def get_party_details(party_name: str):
 async def get_fund_flow_chains():
     try:
         chains = fund_flow_builder.get_chain_summary()
-        return JSONResponse(content={"status": "success", "fund_flow_chains": chains})
+        return {"status": "success", "fund_flow_chains": chains}
     except Exception as e:
         logger.error(f"Error getting fund flow chains: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -590,7 +731,7 @@ async def get_party_ledger():
     try:
         party_ledger = entity_normalizer.get_party_ledger_summary()
         statistics = entity_normalizer.get_statistics()
-        return JSONResponse(content={"status": "success", "party_ledger": {"parties": party_ledger, "total_parties": len(party_ledger), "statistics": statistics}})
+        return ORJSONResponse(content={"status": "success", "party_ledger": {"parties": party_ledger, "total_parties": len(party_ledger), "statistics": statistics}})
     except Exception as e:
         logger.error(f"Error getting party ledger: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -599,7 +740,7 @@ async def get_party_ledger():
 async def get_party_relations():
     try:
         relations = entity_normalizer.get_entity_relation_index()
-        return JSONResponse(content={"status": "success", "relations": relations, "total_relations": len(relations)})
+        return ORJSONResponse(content={"status": "success", "relations": relations, "total_relations": len(relations)})
     except Exception as e:
         logger.error(f"Error getting relations: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -612,7 +753,7 @@ async def export_analysis(format: str = Query("json")):
         entity_relations = entity_normalizer.get_entity_relation_index()
         
         export_data = {"export_timestamp": datetime.now().isoformat(), "party_ledger": party_ledger, "fund_flow_chains": fund_flow_chains, "entity_relations": entity_relations}
-        return JSONResponse(content=export_data)
+        return ORJSONResponse(content=export_data)
     except Exception as e:
         logger.error(f"Error exporting data: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -622,5 +763,15 @@ async def get_report(report_id: str):
     return {"message": "Report generation endpoint", "report_id": report_id}
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True, log_level="info")
+    # Auto-reload is for local development only; set DEBUG=1 to enable it
+    debug = os.getenv("DEBUG", "").lower() in ("1", "true", "yes")
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        reload=debug,
+        log_level="info"
+    )
 
@@ -4,31 +4,138 @@ Comprehensive pattern matching for Indian bank statements
 """
 
 import re
-from typing import Dict, List, Optional, Set, Tuple
+import sys
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from collections import defaultdict
-from difflib import SequenceMatcher
+from dataclasses import dataclass, field
+from itertools import repeat
+from functools import lru_cache
 import logging
+from rapidfuzz import fuzz
 
 logger = logging.getLogger(__name__)
 
+# Advanced extraction: "TO PARTYNAME", "FROM PARTYNAME", ...
+_ADVANCED_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'TO\s+([A-Z][A-Za-z\s]{2,})',
+    r'FOR\s+([A-Z][A-Za-z\s]{2,})',
+    r'FROM\s+([A-Z][A-Za-z\s]{2,})',
+    r'AT\s+([A-Z][A-Za-z\s]{2,})',
+    r'ON\s+([A-Z][A-Za-z\s]{2,})',
+))
+_ADVANCED_PREFIX_RE = re.compile(r'^(TO|FROM|FOR|AT|ON|BY|REF|REFNO|NO|NEW|AC|ACC|ACCOUNT)\s*')
+
+# Name normalization scrubs: digits, '#', '*' and anything that is neither a word
+# character nor whitespace become spaces. ASCII is handled by a translate table;
+# the regex is only needed for names with other characters.
+_PUNCT_SCRUB_RE = re.compile(r'[^\w\s]')
+_ASCII_SCRUB_TABLE = str.maketrans({
+    c: ' ' for c in map(chr, range(128)) if c in '0123456789#*' or _PUNCT_SCRUB_RE.match(c)
+})
+_NAME_PREFIX_RE = re.compile(r'^(?:TO|FROM|FOR|AT|ON|BY|REF|REFNO|NO|NEW|AC|ACC|ACCOUNT|TRANSFER|TRF)\s*', re.IGNORECASE)
+
+# Captures that are transaction vocabulary rather than a party
+_NON_PARTY_WORDS = frozenset({
+    'DR', 'CR', 'TRF', 'BY', 'TO', 'FROM', 'PAID', 'RECEIVED', 'TRANSFER', 'DEPOSIT',
+    'WITHDRAWAL', 'BALANCE', 'CHARGES', 'FEE'
+})
+
+# Transaction vocabulary stripped before falling back to meaningful words
+_TRANSACTION_WORDS = (
+    'DEPOSIT', 'WITHDRAWAL', 'PAYMENT', 'TRANSFER', 'CREDIT', 'DEBIT',
+    'BALANCE', 'CHARGES', 'FEE', 'TAX', 'EMI', 'BILL', 'SALARY',
+    'INTEREST', 'DIVIDEND', 'REFUND', 'REVERSAL', 'CLEARING', 'NO', 'NUM',
+)
+_CONNECTOR_WORDS = ('BY', 'TO', 'FROM', 'FOR', 'AT', 'ON')
+
+
+def _word_alternation(words) -> re.Pattern:
+    """Compile a whole-word alternation so a single pass removes every listed word."""
+    return re.compile(r'\b(?:' + '|'.join(map(re.escape, words)) + r')\b', re.IGNORECASE)
+
+
+_TRANSACTION_WORDS_RE = _word_alternation(_TRANSACTION_WORDS)
+_TRANSACTION_CONNECTOR_WORDS_RE = _word_alternation(_TRANSACTION_WORDS + _CONNECTOR_WORDS)
+
+# Literal keywords that every pattern in a group requires, mapped to the groups
+# they unlock. One scan finds all of them (overlapping hits included) and only
+# the groups present in the narration are tried.
+_GROUP_KEYWORDS = {
+    'UPI': ('upi',), '@': ('upi',), 'PAYTM': ('upi',), 'GPAY': ('upi',), 'PHONEPE': ('upi',),
+    'RTGS': ('rtgs', 'transfer'), 'NEFT': ('neft', 'transfer'), 'IMPS': ('imps', 'transfer'),
+    'TRANSFER': ('transfer',), 'PAID': ('transfer',), 'RECEIVED': ('transfer',), 'TRF': ('transfer',),
+    'PAYMENT': ('transfer', 'bill'),
+    'CHEQUE': ('cheque',), 'CHQ': ('cheque',),
+    'CASH': ('cash',),
+    'BILL': ('bill',), 'EMI': ('bill',), 'LOAN': ('bill',), 'INSURANCE': ('bill',),
+    'SALARY': ('salary',), 'INTEREST': ('salary',), 'DIVIDEND': ('salary',),
+}
+# Each keyword gets its own capture group so the hit is identified by index;
+# case-insensitive matches need not spell the keyword exactly
+_GROUP_KEYWORD_RE = re.compile(
+    '(?=' + '|'.join(f'({re.escape(k)})' for k in _GROUP_KEYWORDS) + ')', re.IGNORECASE
+)
+_GROUP_KEYWORD_TARGETS = (None,) + tuple(_GROUP_KEYWORDS.values())
+
+
+# Descriptions are truncated to this length before pattern matching; several
+# patterns backtrack quadratically on long runs of letters and spaces
+MAX_DESCRIPTION_LENGTH = 512
+
+# Exemplar raw names kept per entity; the full set grows with every distinct narration
+MAX_ORIGINAL_NAMES = 5
+
+
+@dataclass(slots=True)
+class PendingRegistration:
+    """Totals accumulated for one entity during bulk_register."""
+    original: str
+    entity_type: str
+    originals: Set[str] = field(default_factory=set)
+    count: int = 0
+    credit: float = 0.0
+    debit: float = 0.0
+
+
+def _remember_names(names: Set[str], new_names: Iterable[str]):
+    """Add original names to an entity's exemplars, keeping at most MAX_ORIGINAL_NAMES."""
+    for name in new_names:
+        if len(names) >= MAX_ORIGINAL_NAMES:
+            break
+        names.add(name)
+
+
+# Short names have too few trigrams for blocking to find their near-spellings
+# (e.g. RAVI / RVAI share none), so they are always scored against everything.
+# The trigram index files them under '' (no real trigram is empty).
+_FULL_SCAN_NAME_LENGTH = 6
+_SHORT_NAMES_KEY = ''
+
+
+def _name_trigrams(name: str) -> Set[str]:
+    """Character trigrams of a space-padded name, used to block similarity candidates."""
+    padded = f' {name} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _compile_patterns(patterns: List[str]) -> List[re.Pattern]:
+    """Compile a pattern group once; narrations are matched case-insensitively."""
+    return [re.compile(p, re.IGNORECASE) for p in patterns]
+
 
 class EntityNormalizer:
     def __init__(self):
         self.entities: Dict[str, Dict] = {}
-        self.entity_relations: Dict[str, Dict] = defaultdict(lambda: {
-            'sent_to': set(),
-            'received_from': set(),
-            'shared_refs': set(),
-            'upi_handles': set(),
-            'transaction_count': 0,
-            'total_amount': 0.0
-        })
+        # Party relations as parallel arrays indexed by a dense party id
+        self.relation_ids: Dict[str, int] = {}
+        self.relation_sent_to: List[Set[str]] = []
+        self.relation_received_from: List[Set[str]] = []
         
         self.upi_clusters: Dict[str, Set[str]] = defaultdict(set)
         self.upi_to_party: Dict[str, str] = {}
         
         # ========== COMPREHENSIVE UPI PATTERNS ==========
-        self.upi_patterns = [
+        self.upi_patterns = _compile_patterns([
             # UPI/CR/REF/PARTY/OK, UPI/DR/REF/PARTY/OK formats
             r'UPI/(?:CR|DR)/\d+/(.+?)/(?:OK|FAIL|PA|BI|AX|PASS)',
             r'UPI/(?:CR|DR)/\d+/(.+?)$',
@@ -49,37 +156,37 @@ class EntityNormalizer:
             # Additional common formats
             r'(?:UPI|PAYTM|GPAY|PHONEPE)[/\s]*(?:CR|DR)?[/\s]*(?:D\d+)?[/\s]*([A-Z][A-Za-z\s]+?)(?:/OKPA|/OKAX|/OKBI|/OK|/PAYPASS|$)',
             r'(?:UPI|upi)(?:[/\s-]*(?:CR|DR))?[/\s-]*\d*[/\s-]*([A-Z][A-Za-z\s]+?)(?:[/\s]*(?:OK|PA|BI)$|$)',
-        ]
+        ])
         
         # ========== RTGS PATTERNS ==========
-        self.rtgs_patterns = [
+        self.rtgs_patterns = _compile_patterns([
             r'RTGS\s+CR[-]\s*[A-Z0-9]+[-]\s*([A-Z][A-Za-z\s]+?)(?:[-]\s*[A-Z0-9]|$)',
             r'RTGS\s+(?:CR|DR)[-]\s*([A-Z][A-Za-z\s]+?)(?:[-]|$)',
             r'RTGS\s+(?:from|to)?\s*([A-Z][A-Za-z\s]+?)(?:\s*$|,)',
             r'RTGS[/\s]+(?:transfer|TRF)?[/\s]*([A-Z][A-Za-z\s]+?)(?:\s*$|,)',
             r'RTGS\s+(?:CR|DR)?\s*[A-Z0-9/\-]*\s*([A-Z][A-Za-z\s]{2,})',
-        ]
+        ])
         
         # ========== NEFT PATTERNS ==========
-        self.neft_patterns = [
+        self.neft_patterns = _compile_patterns([
             r'NEFT\s+CR[-]\s*[A-Z0-9]+[-]\s*([A-Z][A-Za-z\s]+?)(?:[-]|$)',
             r'NEFT\s+(?:CR|DR)[-]\s*[A-Z0-9]+[-]\s*([A-Z][A-Za-z\s]+?)(?:[-]|$)',
             r'NEFT\s+(?:from|to)?\s*([A-Z][A-Za-z\s]+?)(?:\s*$|,)',
             r'NEFT[/\s]+(?:transfer|TRF)?[/\s]*([A-Z][A-Za-z\s]+?)(?:\s*$|,)',
             r'NEFT\s+(?:CR|DR)?\s*[A-Z0-9/\-]*\s*([A-Z][A-Za-z\s]{2,})',
-        ]
+        ])
         
         # ========== IMPS PATTERNS ==========
-        self.imps_patterns = [
+        self.imps_patterns = _compile_patterns([
             r'IMPS\s+(?:CR|DR)[-]\s*[A-Z0-9]+[-]\s*([A-Z][A-Za-z\s]+?)(?:[-]|$)',
             r'IMPS[/]*(?:from|to)?\s*([A-Z][A-Za-z\s]+?)(?:\s*$|,)',
             r'IMPS\s+(?:from|to)?\s*([A-Z][A-Za-z\s]+?)(?:\s*$)',
             r'IMPS[/\s]+(?:transfer|TRF)?[/\s]*([A-Z][A-Za-z\s]+?)(?:\s*$|,)',
             r'IMPS\s+(?:CR|DR)?\s*[A-Z0-9/\-]*\s*([A-Z][A-Za-z\s]{2,})',
-        ]
+        ])
         
         # ========== TRANSFER PATTERNS ==========
-        self.transfer_patterns = [
+        self.transfer_patterns = _compile_patterns([
             r'(?:transfer|TRANSFER)\s+(?:from|to|FROM|TO)\s+([A-Z][A-Za-z\s]+?)(?:\s*$|,)',
             r'PAID\s+TO\s+([A-Z][A-Za-z\s]+?)(?:\s*$|,)',
             r'RECEIVED\s+FROM\s+([A-Z][A-Za-z\s]+?)(?:\s*$|,)',
@@ -87,46 +194,50 @@ class EntityNormalizer:
             r'TRF\s+(?:TO|FROM)[:\s]*([A-Z][A-Za-z\s]+?)(?:\s*$|,)',
             r'TRANSFER\s+(?:TO|FROM)?\s*([A-Z][A-Za-z\s]+?)(?:\s*$|,)',
             r'Payment\s+(?:to|from)?\s*([A-Z][A-Za-z\s]+?)(?:\s*$|,)',
-        ]
+        ])
         
         # ========== CASH PATTERNS ==========
-        self.cash_patterns = [
+        self.cash_patterns = _compile_patterns([
             r'CASH\s+DEPOSIT\s+(?:AT|BY)?\s*([A-Z][A-Za-z\s]+?)(?:\s*$|,)',
             r'CASH\s+(?:DEPOSIT|WITHDRAWAL)[-]\s*([A-Z][A-Za-z\s]+?)(?:\s*$|,)',
             r'CASH\s+BY\s+([A-Z][A-Za-z\s]+?)(?:\s*$|,)',
             r'CASH\s+(?:DEPOSIT|WITHDRAWAL)\s+(?:AT)?\s*([A-Z][A-Za-z\s]{2,})',
-        ]
+        ])
         
         # ========== BILL/EMI PATTERNS ==========
-        self.bill_patterns = [
+        self.bill_patterns = _compile_patterns([
             r'(?:BILL|EMI|LOAN)\s+(?:PAYMENT|REPAYMENT)[:\s]*([A-Z][A-Za-z\s]+?)(?:\s*$|,)',
             r'(?:BILL|EMI)\s+(?:FOR|TO)?\s*([A-Z][A-Za-z\s]+?)(?:\s*$|,)',
             r'(?:CREDIT\s+CARD|DEBIT\s+CARD)\s+BILL[:\s]*([A-Z][A-Za-z\s]+?)(?:\s*$|,)',
             r'INSURANCE\s+(?:PREMIUM|PAYMENT)[:\s]*([A-Z][A-Za-z\s]+?)(?:\s*$|,)',
             r'(?:BILL|PAYMENT)\s+(?:FOR|TO)?\s*([A-Z][A-Za-z\s]{2,})',
-        ]
+        ])
         
         # ========== SALARY/INTEREST PATTERNS ==========
-        self.salary_patterns = [
+        self.salary_patterns = _compile_patterns([
             r'SALARY\s+(?:FROM|TO)?\s*([A-Z][A-Za-z\s]+?)(?:\s*$|,)',
             r'INTEREST\s+(?:FROM|ON)?\s*([A-Z][A-Za-z\s]+?)(?:\s*$|,)',
             r'DIVIDEND\s+(?:FROM)?\s*([A-Z][A-Za-z\s]+?)',
-        ]
+        ])
         
         # ========== CHEQUE PATTERNS ==========
-        self.cheque_patterns = [
+        self.cheque_patterns = _compile_patterns([
             r'CHEQUE\s+(?:PAYMENT|DEPOSIT|CLEARING)[:\s-]*([A-Z][A-Za-z\s]{2,})',
             r'CHQ[:\s-]*([A-Z][A-Za-z\s]{2,})',
             r'CHEQUE\s+NO[:\s]*\d+\s*(?:DRAWN\s+ON)?\s*([A-Z][A-Za-z\s]{2,})',
-        ]
+        ])
         
         # ========== INTEREST PATTERNS ==========
-        self.interest_patterns = [
+        self.interest_patterns = _compile_patterns([
             r'CASA\s+CREDIT\s+INTEREST\s+CAPITALIZED',
             r'INTEREST\s+CAPITALIZED',
             r'INTEREST\s+PAID',
             r'INTEREST\s+CREDITED',
-        ]
+        ])
+        # Only whether any of them matches matters, so test them as one alternation
+        self.interest_re = re.compile(
+            '|'.join(f'(?:{p.pattern})' for p in self.interest_patterns), re.IGNORECASE
+        )
         
         # ========== SUFFIXES TO REMOVE ==========
         self.suffixes_to_remove = [
@@ -145,138 +256,198 @@ class EntityNormalizer:
             'OLA': 'OLA', 'IRCTC': 'IRCTC', 'MM': 'MAKE MY TRIP',
         }
         
+        # Pattern groups in priority order: (group, patterns, entity type)
+        self.pattern_groups = [
+            ('upi', self.upi_patterns, 'UPI'),
+            ('rtgs', self.rtgs_patterns, 'Transfer'),
+            ('neft', self.neft_patterns, 'Transfer'),
+            ('imps', self.imps_patterns, 'Transfer'),
+            ('transfer', self.transfer_patterns, 'Transfer'),
+            ('cheque', self.cheque_patterns, 'Cheque'),
+            ('cash', self.cash_patterns, 'Cash'),
+            ('bill', self.bill_patterns, 'Bill'),
+            ('salary', self.salary_patterns, 'Income'),
+        ]
+        # The cascade reads match.group(1), so every group pattern must capture
+        assert all(p.groups >= 1 for _, patterns, _ in self.pattern_groups for p in patterns)
+        
+        self._suffix_words = frozenset(self.suffixes_to_remove)
+        self._suffix_re = _word_alternation(self.suffixes_to_remove)
+        
         self.similarity_threshold = 0.75
+        
+        # Resolution and normalization depend only on their input and the static
+        # pattern tables above, and statements repeat the same narrations heavily
+        self._resolve_entity = lru_cache(maxsize=65536)(self._resolve_entity)
+        self._normalize_name = lru_cache(maxsize=16384)(self._normalize_name)
     
-    def extract_entity(self, description: str, amount: float, is_credit: bool = True) -> Optional[str]:
+    def extract_entity(self, description: str, amount: float, is_credit: bool = True,
+                       hint: Optional[str] = None) -> Optional[str]:
         """
         Extract and normalize entity/party name from transaction description.
+        If hint (a party already detected upstream) is given, the entity is
+        registered under its normalized name and the description only decides
+        the entity type.
         Returns the normalized party name or None if not found.
         """
-        if not description:
+        resolved = self._resolve_entity(description, hint)
+        if not resolved:
+            return None
+        
+        normalized, original, entity_type = resolved
+        self._register_entity(normalized, original, entity_type, amount, is_credit)
+        return normalized
+    
+    def bulk_register(self, records: List[Tuple[str, float, bool, Optional[str]]]) -> List[Optional[str]]:
+        """
+        Register many (description, amount, is_credit, hint) records in one sweep.
+        Each distinct (description, hint) pair is resolved once, totals are summed
+        per entity and every entity is then updated once. Returns the registered
+        name for each record, in order.
+        """
+        resolved_by_key: Dict[Tuple[str, Optional[str]], Optional[Tuple[str, str, str]]] = {}
+        pending: Dict[str, PendingRegistration] = {}
+        registered = []
+        
+        for description, amount, is_credit, hint in records:
+            key = (description, hint)
+            if key not in resolved_by_key:
+                resolved_by_key[key] = self._resolve_entity(description, hint)
+            resolved = resolved_by_key[key]
+            
+            if not resolved:
+                registered.append(None)
+                continue
+            
+            normalized, original, entity_type = resolved
+            totals = pending.get(normalized)
+            if totals is None:
+                totals = pending[normalized] = PendingRegistration(original, entity_type)
+            if len(totals.originals) < MAX_ORIGINAL_NAMES:
+                totals.originals.add(original)
+            totals.count += 1
+            if is_credit:
+                totals.credit += abs(amount)
+            else:
+                totals.debit += abs(amount)
+            registered.append(normalized)
+        
+        for normalized, totals in pending.items():
+            entity = self._get_or_create_entity(normalized, totals.original, totals.entity_type)
+            _remember_names(entity['original_names'], totals.originals)
+            entity['transaction_count'] += totals.count
+            entity['total_credit'] += totals.credit
+            entity['total_debit'] += totals.debit
+        
+        return registered
+    
+    def extract_entities_batch(self, descriptions: Iterable[str], amounts: Iterable[float],
+                               is_credits: Iterable[bool],
+                               hints: Optional[Iterable[Optional[str]]] = None) -> List[Optional[str]]:
+        """
+        Column-wise extract_entity for callers holding parallel columns
+        (lists or pandas Series). Returns the normalized party for each row.
+        """
+        if hints is None:
+            hints = repeat(None)
+        return self.bulk_register(list(zip(descriptions, amounts, is_credits, hints)))
+    
+    def _resolve_entity(self, description: str, hint: Optional[str] = None) -> Optional[Tuple[str, str, str]]:
+        """
+        Resolve a description (and optional upstream party) to
+        (normalized name, original name, entity type) without registering it.
+        """
+        if not description and not hint:
             return None
         
-        description = str(description).upper().strip()
+        description = str(description or '').upper().strip()[:MAX_DESCRIPTION_LENGTH]
         entity = None
         entity_type = 'General'
-        upi_handle = None
         
         # ========== STEP 1: Check interest patterns ==========
-        for pattern in self.interest_patterns:
-            if re.search(pattern, description, re.IGNORECASE):
-                entity = 'INTEREST INCOME'
-                entity_type = 'Income'
-                logger.debug(f"Match (Income): '{description}' -> '{entity}'")
-                break
+        if self.interest_re.search(description):
+            entity = 'INTEREST INCOME'
+            entity_type = 'Income'
+            logger.debug("Match (Income): '%s' -> '%s'", description, entity)
         
         # ========== STEP 2: Try all pattern groups ==========
         if not entity:
-            pattern_groups = [
-                (self.upi_patterns, 'UPI'),
-                (self.rtgs_patterns, 'Transfer'),
-                (self.neft_patterns, 'Transfer'),
-                (self.imps_patterns, 'Transfer'),
-                (self.transfer_patterns, 'Transfer'),
-                (self.cheque_patterns, 'Cheque'),
-                (self.cash_patterns, 'Cash'),
-                (self.bill_patterns, 'Bill'),
-                (self.salary_patterns, 'Income'),
-            ]
+            groups = set()
+            for hit in _GROUP_KEYWORD_RE.finditer(description):
+                groups.update(_GROUP_KEYWORD_TARGETS[hit.lastindex])
             
-            for patterns, etype in pattern_groups:
+            for group, patterns, etype in self.pattern_groups:
+                if group not in groups:
+                    continue
                 for pattern in patterns:
-                    match = re.search(pattern, description, re.IGNORECASE)
-                    if match:
-                        try:
-                            if match.group(1):
-                                candidate = match.group(1).upper().strip()
-                                candidate = ' '.join(candidate.split())
-                                # Filter out common non-party words
-                                if (len(candidate) >= 2 and 
-                                    candidate not in ['DR', 'CR', 'TRF', 'BY', 'TO', 'FROM', 
-                                                    'PAID', 'RECEIVED', 'TRANSFER', 'DEPOSIT',
-                                                    'WITHDRAWAL', 'BALANCE', 'CHARGES', 'FEE']):
-                                    entity = candidate
-                                    entity_type = etype
-                                    logger.debug(f"Match ({etype}): '{description}' -> '{entity}'")
-                                    break
-                        except IndexError:
-                            continue
+                    match = pattern.search(description)
+                    if match and match.group(1):
+                        candidate = ' '.join(match.group(1).split())
+                        # Filter out common non-party words
+                        if len(candidate) >= 2 and candidate not in _NON_PARTY_WORDS:
+                            entity = candidate
+                            entity_type = etype
+                            logger.debug("Match (%s): '%s' -> '%s'", etype, description, entity)
+                            break
                 if entity:
                     break
         
-        # ========== STEP 3: If entity found, register and return ==========
+        # ========== STEP 3: Use the upstream party if given ==========
+        if hint:
+            normalized = self._normalize_name(hint)
+            if normalized and len(normalized) >= 2:
+                return normalized, hint, entity_type
+        
+        # ========== STEP 4: If entity found, use it ==========
         if entity:
             normalized = self._normalize_name(entity)
             if normalized and len(normalized) >= 2:
-                self._register_entity(normalized, entity, entity_type, amount, is_credit, upi_handle)
-                return normalized
+                return normalized, entity, entity_type
         
-        # ========== STEP 4: Try advanced extraction ==========
+        # ========== STEP 5: Try advanced extraction ==========
         entity = self._extract_party_advanced(description)
         if entity:
             normalized = self._normalize_name(entity)
             if normalized and len(normalized) >= 2:
-                self._register_entity(normalized, entity, 'General', amount, is_credit, upi_handle)
-                return normalized
+                return normalized, entity, 'General'
         
-        # ========== STEP 5: Last resort - extract meaningful words from description ==========
+        # ========== STEP 6: Last resort - extract meaningful words from description ==========
         # This ensures every transaction has a party associated with it
-        cleaned = description
-        transaction_words = ['DEPOSIT', 'WITHDRAWAL', 'PAYMENT', 'TRANSFER', 'CREDIT', 'DEBIT',
-                           'BALANCE', 'CHARGES', 'FEE', 'TAX', 'EMI', 'BILL', 'SALARY',
-                           'INTEREST', 'DIVIDEND', 'REFUND', 'REVERSAL', 'CLEARING', 'NO', 'NUM',
-                           'BY', 'TO', 'FROM', 'FOR', 'AT', 'ON']
-        for word in transaction_words:
-            cleaned = re.sub(r'\b' + word + r'\b', ' ', cleaned, flags=re.IGNORECASE)
-        
-        words = cleaned.strip().split()
+        cleaned = _TRANSACTION_CONNECTOR_WORDS_RE.sub(' ', description)
+        
+        words = cleaned.split()
         meaningful = [w for w in words if len(w) > 2 and not w.isdigit()]
         
         if meaningful:
-            candidate = ' '.join(meaningful[:3]).upper()
-            candidate = self._normalize_name(candidate)
+            candidate = self._normalize_name(' '.join(meaningful[:3]))
             if len(candidate) >= 2:
-                self._register_entity(candidate, candidate, 'General', amount, is_credit, upi_handle)
-                return candidate
+                return candidate, candidate, 'General'
         
         return None
     
     def _extract_party_advanced(self, description):
         """
         Advanced party extraction for complex narrations.
+        Expects the uppercased, stripped description _resolve_entity works on.
         """
         # Try patterns like "TO PARTYNAME", "FROM PARTYNAME"
-        patterns = [
-            r'TO\s+([A-Z][A-Za-z\s]{2,})',
-            r'FOR\s+([A-Z][A-Za-z\s]{2,})',
-            r'FROM\s+([A-Z][A-Za-z\s]{2,})',
-            r'AT\s+([A-Z][A-Za-z\s]{2,})',
-            r'ON\s+([A-Z][A-Za-z\s]{2,})',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, description, re.IGNORECASE)
+        for pattern in _ADVANCED_PATTERNS:
+            match = pattern.search(description)
             if match:
-                candidate = match.group(1).upper().strip()
-                candidate = ' '.join(candidate.split())
+                candidate = ' '.join(match.group(1).split())
                 # Remove common prefixes
-                candidate = re.sub(r'^(TO|FROM|FOR|AT|ON|BY|REF|REFNO|NO|NEW|AC|ACC|ACCOUNT)\s*', '', candidate)
+                candidate = _ADVANCED_PREFIX_RE.sub('', candidate)
                 if len(candidate) >= 2:
                     return candidate
         
         # Last resort: extract meaningful words
-        transaction_words = ['DEPOSIT', 'WITHDRAWAL', 'PAYMENT', 'TRANSFER', 'CREDIT', 'DEBIT',
-                           'BALANCE', 'CHARGES', 'FEE', 'TAX', 'EMI', 'BILL', 'SALARY',
-                           'INTEREST', 'DIVIDEND', 'REFUND', 'REVERSAL', 'CLEARING', 'NO', 'NUM']
-        cleaned = description
-        for word in transaction_words:
-            cleaned = re.sub(r'\b' + word + r'\b', ' ', cleaned, flags=re.IGNORECASE)
-        
-        words = cleaned.strip().split()
+        cleaned = _TRANSACTION_WORDS_RE.sub(' ', description)
+        
+        words = cleaned.split()
         meaningful = [w for w in words if len(w) > 2 and not w.isdigit()]
         
         if meaningful:
-            return ' '.join(meaningful[:3]).upper()
+            return ' '.join(meaningful[:3])
         
         return None
     
@@ -294,15 +465,18 @@ class EntityNormalizer:
             name = self.merchant_aliases[name]
         
         # Remove digits and special characters (but keep some context)
-        name = re.sub(r'[0-9#*]', ' ', name)
-        name = re.sub(r'[^\w\s]', ' ', name)
+        name = name.translate(_ASCII_SCRUB_TABLE)
         
-        # Remove business suffixes
-        for suffix in self.suffixes_to_remove:
-            name = re.sub(r'\b' + suffix + r'\b', '', name, flags=re.IGNORECASE).strip()
+        # Remove business suffixes. Only word characters and spaces are left
+        # in an ASCII name, so whole-word matches are exactly its tokens.
+        if name.isascii():
+            name = ' '.join(word for word in name.split() if word not in self._suffix_words)
+        else:
+            name = _PUNCT_SCRUB_RE.sub(' ', name)
+            name = self._suffix_re.sub('', name).strip()
         
         # Remove common prefixes
-        name = re.sub(r'^(?:TO|FROM|FOR|AT|ON|BY|REF|REFNO|NO|NEW|AC|ACC|ACCOUNT|TRANSFER|TRF)\s*', '', name, flags=re.IGNORECASE)
+        name = _NAME_PREFIX_RE.sub('', name)
         
         # Clean up whitespace
         name = ' '.join(name.split())
@@ -312,21 +486,9 @@ class EntityNormalizer:
     def _register_entity(self, normalized: str, original: str, entity_type: str, 
                          amount: float, is_credit: bool, upi_handle: Optional[str] = None):
         """Register an entity in the system."""
-        if normalized not in self.entities:
-            self.entities[normalized] = {
-                'original_names': set([original]),
-                'entity_type': entity_type,
-                'transaction_count': 0,
-                'total_credit': 0.0,
-                'total_debit': 0.0,
-                'first_seen': None,
-                'last_seen': None,
-                'upi_handles': set(),
-                'phone_numbers': set(),
-                'aliases': set()
-            }
+        self._get_or_create_entity(normalized, original, entity_type)
         
-        self.entities[normalized]['original_names'].add(original)
+        _remember_names(self.entities[normalized]['original_names'], (original,))
         self.entities[normalized]['transaction_count'] += 1
         
         if is_credit:
@@ -338,12 +500,41 @@ class EntityNormalizer:
             self.entities[normalized]['upi_handles'].add(upi_handle)
             self.upi_to_party[upi_handle] = normalized
     
+    def _get_or_create_entity(self, normalized: str, original: str, entity_type: str) -> Dict:
+        """Return the record for an entity, creating an empty one on first sight."""
+        if normalized not in self.entities:
+            # Party names repeat across records and structures; share one string object
+            self.entities[sys.intern(normalized)] = {
+                'original_names': set([original]),
+                'entity_type': entity_type,
+                'transaction_count': 0,
+                'total_credit': 0.0,
+                'total_debit': 0.0,
+                'first_seen': None,
+                'last_seen': None,
+                'upi_handles': set(),
+                'phone_numbers': set(),
+                'aliases': set(),
+                # Word set of the name, reused by every similarity comparison
+                'name_tokens': frozenset(normalized.split())
+            }
+        return self.entities[normalized]
+    
     def _calculate_similarity(self, str1: str, str2: str) -> float:
-        """Calculate similarity ratio between two strings."""
-        return SequenceMatcher(None, str1.lower(), str2.lower()).ratio()
+        """Calculate similarity ratio (normalized Indel similarity, 0-1) between two strings."""
+        return fuzz.ratio(str1.lower(), str2.lower()) / 100.0
     
-    def find_similar_entities(self, entity: str, threshold: float = None) -> List[Tuple[str, float]]:
-        """Find entities similar to the given entity name."""
+    def find_similar_entities(self, entity: str, threshold: float = None,
+                              trigram_index: Optional[Dict[str, Set[str]]] = None,
+                              exclude: Optional[Set[str]] = None) -> List[Tuple[str, float]]:
+        """
+        Find entities similar to the given entity name.
+        With a trigram index (see _build_trigram_index) only entities sharing
+        at least one character trigram with the name, and short names, are
+        scored. This trades recall for speed: two longer names can clear the
+        threshold without sharing a trigram and are then missed. A short name
+        is scored against every entity. Entities in exclude are never scored.
+        """
         if threshold is None:
             threshold = self.similarity_threshold
         
@@ -351,23 +542,42 @@ class EntityNormalizer:
         if not normalized:
             return []
         
+        if trigram_index is None or len(normalized) <= _FULL_SCAN_NAME_LENGTH:
+            pool = self.entities.keys()
+        else:
+            pool = set(trigram_index.get(_SHORT_NAMES_KEY, ()))
+            for gram in _name_trigrams(normalized):
+                pool.update(trigram_index.get(gram, ()))
+        if exclude:
+            pool = [existing for existing in pool if existing not in exclude]
+        
         candidates = []
+        name_length = len(normalized)
+        words1 = frozenset(normalized.split())
         
-        for existing in self.entities.keys():
+        for existing in pool:
+            if existing not in self.entities:
+                continue
+            
             if normalized == existing:
                 candidates.append((existing, 1.0))
                 continue
             
-            similarity = self._calculate_similarity(normalized, existing)
+            # The ratio is at most 2 * shorter / (sum of lengths); skip the scorer
+            # when that bound cannot reach the threshold (the boosts still apply)
+            existing_length = len(existing)
+            if 2 * min(name_length, existing_length) < threshold * (name_length + existing_length):
+                similarity = 0.0
+            else:
+                similarity = self._calculate_similarity(normalized, existing)
             
             # Boost similarity for substring matches
             if normalized in existing or existing in normalized:
-                overlap = min(len(normalized), len(existing)) / max(len(normalized), len(existing))
+                overlap = min(name_length, existing_length) / max(name_length, existing_length)
                 similarity = max(similarity, overlap)
             
             # Boost similarity for word overlap
-            words1 = set(normalized.split())
-            words2 = set(existing.split())
+            words2 = self.entities[existing]['name_tokens']
             if words1 and words2:
                 word_overlap = len(words1 & words2) / len(words1 | words2)
                 similarity = max(similarity, word_overlap)
@@ -392,7 +602,7 @@ class EntityNormalizer:
         entity1_data = self.entities[norm1]
         entity2_data = self.entities.pop(norm2)
         
-        entity1_data['original_names'].update(entity2_data['original_names'])
+        _remember_names(entity1_data['original_names'], entity2_data['original_names'])
         entity1_data['transaction_count'] += entity2_data['transaction_count']
         entity1_data['total_credit'] += entity2_data['total_credit']
         entity1_data['total_debit'] += entity2_data['total_debit']
@@ -403,19 +613,38 @@ class EntityNormalizer:
         
         return True
     
+    def _build_trigram_index(self) -> Dict[str, Set[str]]:
+        """Map each character trigram to the entity names containing it; short names also go under ''."""
+        index = defaultdict(set)
+        for name in self.entities:
+            for gram in _name_trigrams(name):
+                index[gram].add(name)
+            if len(name) <= _FULL_SCAN_NAME_LENGTH:
+                index[_SHORT_NAMES_KEY].add(name)
+        return index
+    
     def auto_merge_similar_entities(self, threshold: float = None) -> int:
-        """Automatically merge similar entities."""
+        """
+        Automatically merge similar entities.
+        Candidates are blocked on shared character trigrams instead of scoring
+        every pair of entities (names of up to _FULL_SCAN_NAME_LENGTH characters
+        are still compared with everything), so a pair of longer names that
+        shares no trigram is not merged even if it would clear the threshold.
+        Each pair is scored once: entities already processed cannot be merged
+        again, so they are not scored against later ones.
+        """
         if threshold is None:
             threshold = self.similarity_threshold
         
         merged_count = 0
         processed = set()
+        trigram_index = self._build_trigram_index()
         
         for entity in list(self.entities.keys()):
             if entity in processed:
                 continue
             
-            similar = self.find_similar_entities(entity, threshold * 0.9)
+            similar = self.find_similar_entities(entity, threshold * 0.9, trigram_index, processed)
             for similar_entity, score in similar:
                 if similar_entity != entity and similar_entity not in processed:
                     if self.merge_entities(entity, similar_entity):
@@ -435,20 +664,32 @@ class EntityNormalizer:
             return
         
         if is_credit:
-            self.entity_relations[to_norm]['received_from'].add(from_norm)
-            self.entity_relations[from_norm]['sent_to'].add(to_norm)
+            self.relation_received_from[self._relation_id(to_norm)].add(from_norm)
+            self.relation_sent_to[self._relation_id(from_norm)].add(to_norm)
         else:
-            self.entity_relations[from_norm]['sent_to'].add(to_norm)
-            self.entity_relations[to_norm]['received_from'].add(to_norm)
+            self.relation_sent_to[self._relation_id(from_norm)].add(to_norm)
+            self.relation_received_from[self._relation_id(to_norm)].add(to_norm)
+    
+    def _relation_id(self, party: str) -> int:
+        """Return the dense relation id for a party, allocating its slots on first use."""
+        party_id = self.relation_ids.get(party)
+        if party_id is None:
+            party_id = len(self.relation_sent_to)
+            self.relation_ids[party] = party_id
+            self.relation_sent_to.append(set())
+            self.relation_received_from.append(set())
+        return party_id
     
     def get_entity_relation_index(self) -> List[Dict]:
         """Get all party relationships."""
         relations = []
         
-        for party, data in self.entity_relations.items():
+        for party, party_id in self.relation_ids.items():
             if party not in self.entities:
                 continue
             
+            sent_to = self.relation_sent_to[party_id]
+            received_from = self.relation_received_from[party_id]
             entity_data = self.entities[party]
             total_flow = entity_data['total_credit'] + entity_data['total_debit']
             
@@ -456,11 +697,11 @@ class EntityNormalizer:
                 'party': party,
                 'normalized_name': party,
                 'entity_type': entity_data.get('entity_type', 'Unknown'),
-                'sent_to': sorted(list(data['sent_to'])),
-                'received_from': sorted(list(data['received_from'])),
-                'shared_refs': sorted(list(data['shared_refs'])),
-                'upi_handles': sorted(list(entity_data.get('upi_handles', []))),
-                'transfer_count': len(data['sent_to']) + len(data['received_from']),
+                'sent_to': sorted(sent_to),
+                'received_from': sorted(received_from),
+                'shared_refs': [],
+                'upi_handles': sorted(entity_data.get('upi_handles', [])),
+                'transfer_count': len(sent_to) + len(received_from),
                 'transaction_count': entity_data['transaction_count'],
                 'total_credit': round(entity_data['total_credit'], 2),
                 'total_debit': round(entity_data['total_debit'], 2),
@@ -501,7 +742,7 @@ class EntityNormalizer:
         
         return {
             'total_entities': len(self.entities),
-            'total_relations': len(self.entity_relations),
+            'total_relations': len(self.relation_ids),
             'total_transactions': total_transactions,
             'total_amount': round(total_amount, 2),
             'entity_types': dict(entity_types),
@@ -511,7 +752,9 @@ class EntityNormalizer:
     def clear(self):
         """Clear all data."""
         self.entities.clear()
-        self.entity_relations.clear()
+        self.relation_ids.clear()
+        self.relation_sent_to.clear()
+        self.relation_received_from.clear()
         self.upi_clusters.clear()
         self.upi_to_party.clear()
 
@@ -5,18 +5,221 @@ Comprehensive pattern matching for Indian bank statements
 
 import io
 import logging
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
+from functools import lru_cache
+from itertools import repeat
+import numpy as np
 import pandas as pd
 import re
 
 logger = logging.getLogger(__name__)
 
+# ========== KNOWN MERCHANTS ==========
+# Merchant words mapped to their display names; a narration naming several
+# merchants resolves to the one listed first
+_MERCHANT_NAMES = {
+    'uber': 'UBER',
+    'ola': 'OLA',
+    'swiggy': 'SWIGGY',
+    'zomato': 'ZOMATO',
+    'amazon': 'AMAZON',
+    'flipkart': 'FLIPKART',
+    'myntra': 'MYNTRA',
+    'oyo': 'OYO',
+    'irctc': 'IRCTC',
+    'makemytrip': 'MAKE MY TRIP',
+    'redbus': 'REDBUS',
+    'paytm': 'PAYTM',
+    'phonepe': 'PHONEPE',
+    'gpay': 'GPAY',
+    'bhim': 'BHIM',
+    'google': 'GOOGLE',
+    'netflix': 'NETFLIX',
+    'spotify': 'SPOTIFY',
+    'prime': 'PRIME VIDEO',
+    'hotstar': 'HOTSTAR',
+    'bookmyshow': 'BOOKMYSHOW',
+    'dominos': 'DOMINO\'S',
+    'pizzahut': 'PIZZA HUT',
+    'kfc': 'KFC',
+    'mcdonalds': 'MCDONALD\'S',
+    'sblink': 'BLINKIT',
+    'zepto': 'ZEPTO',
+    'dunzo': 'DUNZO',
+    'snapdeal': 'SNAPDEAL',
+    'ajio': 'AJIO',
+    'nykaa': 'NYKAA',
+    'purplle': 'PURPLLE',
+}
+# One pass finds every merchant word; the hit listed first in _MERCHANT_NAMES wins.
+# Scanned on lowercased text, so each hit is its own key. The lookahead skips
+# positions that cannot start any merchant before the alternation is tried.
+_MERCHANT_RE = re.compile(
+    r'\b(?=[' + ''.join(sorted({word[0] for word in _MERCHANT_NAMES})) + r'])'
+    r'(?:' + '|'.join(map(re.escape, _MERCHANT_NAMES)) + r')\b'
+)
+_MERCHANT_RANK = {word: rank for rank, word in enumerate(_MERCHANT_NAMES)}
+
+# ========== BANK IFSC MAPPING ==========
+_BANK_FROM_IFSC = {
+    'BDBL': 'Bandhan Bank', 'HDFC': 'HDFC Bank', 'SBIN': 'SBI',
+    'ICIC': 'ICICI Bank', 'AXIS': 'Axis Bank', 'KKBK': 'Kotak Mahindra Bank',
+    'YESB': 'Yes Bank', 'IDFB': 'IDFC First Bank', 'CNRB': 'Canara Bank',
+    'UTIB': 'Axis Bank', 'BARB': 'Bank of Baroda', 'PUNB': 'Punjab National Bank',
+    'ORBC': 'Oriental Bank', 'VIJB': 'Vijaya Bank', 'BKID': 'Bank of India',
+    'MAHB': 'Bank of Maharashtra', 'IDIB': 'Indian Bank', 'SYNB': 'Syndicate Bank',
+    'CBIN': 'Central Bank', 'RATN': 'RBL Bank',
+}
+
+# Account profile fields read from the sheet preamble (already uppercased)
+_ACCOUNT_HOLDER_PATTERNS = tuple(re.compile(p) for p in (
+    r'(?:ACCOUNT\s*TITLE[:\s]*)([A-Z][A-Z\s]{2,50})',
+    r'(?:ACCOUNT\s*HOLDER[:\s]*)([A-Z][A-Z\s]{2,50})',
+    r'(?:NAME[:\s]*)([A-Z][A-Z\s]{2,50})',
+))
+_ACCOUNT_NUMBER_RE = re.compile(r'(?:ACCOUNT|NO\.?)[:\s#]*([A-Z0-9]{5,20})')
+_IFSC_RE = re.compile(r'(?:IFSC[:\s]*)([A-Z]{4}[0-9]{7})')
+
+# Statement column headers (lowercased) mapped to the canonical column names
+COLUMN_ALIASES = {
+    'date': 'date', 'trans date': 'date', 'txn date': 'date', 'transaction date': 'date',
+    'posting date': 'date',
+    'description': 'description', 'narration': 'description', 'particulars': 'description',
+    'details': 'description', 'remarks': 'description',
+    'credit': 'credit', 'credits': 'credit', 'cr': 'credit', 'deposit': 'credit', 'deposits': 'credit',
+    'debit': 'debit', 'debits': 'debit', 'dr': 'debit', 'withdrawal': 'debit', 'withdrawals': 'debit',
+    'balance': 'balance', 'bal': 'balance', 'closing balance': 'balance',
+}
+
+# Header row detection: the first row naming at least two of these columns.
+# Statement preambles are short, so only the top of each sheet is searched.
+_HEADER_KEYWORDS = ('date', 'description', 'credit', 'debit', 'balance', 'narration', 'amount')
+HEADER_SCAN_ROWS = 50
+
+# Advanced extraction: "TO PARTYNAME", "FOR PARTYNAME", ...
+_ADVANCED_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'TO\s+([A-Z][A-Za-z\s]{2,})',
+    r'FOR\s+([A-Z][A-Za-z\s]{2,})',
+    r'ON\s+([A-Z][A-Za-z\s]{2,})',
+    r'AT\s+([A-Z][A-Za-z\s]{2,})',
+))
+_ADVANCED_PREFIX_RE = re.compile(r'^(TO|FROM|FOR|AT|ON|BY|REF|REFNO|NO|NEW|AC|ACC|ACCOUNT)\s*', re.IGNORECASE)
+
+# Transaction vocabulary stripped before falling back to meaningful words
+_TRANSACTION_WORDS_RE = re.compile(r'\b(?:' + '|'.join((
+    'DEPOSIT', 'WITHDRAWAL', 'PAYMENT', 'TRANSFER', 'CREDIT', 'DEBIT',
+    'BALANCE', 'CHARGES', 'FEE', 'TAX', 'EMI', 'BILL', 'SALARY',
+    'INTEREST', 'DIVIDEND', 'REFUND', 'REVERSAL', 'CLEARING',
+)) + r')\b', re.IGNORECASE)
+
+# Captures that are transaction vocabulary rather than a party
+_NON_PARTY_WORDS = frozenset({'DR', 'CR', 'TRF', 'BY', 'TO', 'FROM', 'PAID', 'RECEIVED'})
+
+# Transaction flags, matched as substrings of the lowercased description
+_TRANSFER_FLAG_RE = re.compile(r'neft|imps|rtgs|transfer|trf')
+_UPI_FLAG_RE = re.compile(r'upi|@|gpay|phonepe|paytm|bhim')
+
+# Amount cells keep only digits, '.' and '-'. ASCII is handled by a translate
+# table; the regex is only needed for cells with other characters.
+_AMOUNT_SCRUB_RE = re.compile(r'[^0-9.-]')
+_ASCII_AMOUNT_TABLE = str.maketrans({
+    c: None for c in map(chr, range(128)) if c not in '0123456789.-'
+})
+# What float() accepts once the scrub is done; anything else (e.g. a '-' placeholder) is 0.0
+_AMOUNT_NUMBER_RE = re.compile(r'-?(?:[0-9]+\.?[0-9]*|\.[0-9]+)')
+
+# Party name normalization
+_LONG_NUMBER_RE = re.compile(r'\b[\d]{10,}\b')
+_PUNCT_SCRUB_RE = re.compile(r'[^\w\s]')
+_NAME_PREFIX_RE = re.compile(r'^(?:TO|FROM|FOR|VIA|BY|REF|REFNO|NO|NEW|AC|ACC|ACCOUNT|TRANSFER|TRF)\s*', re.IGNORECASE)
+
+# Narrations are cut to this length before pattern matching. The lazy name
+# captures followed by optional whitespace tails backtrack quadratically on
+# long runs of spaces, and no real narration comes close to this.
+MAX_NARRATION_LENGTH = 512
+
+
+def _compile_patterns(patterns):
+    """Compile a pattern group once; narrations are matched case-insensitively."""
+    return [re.compile(p, re.IGNORECASE) for p in patterns]
+
+
+def _keyword_re(*keywords):
+    """Compile a case-insensitive substring alternation of literal keywords."""
+    return re.compile('|'.join(map(re.escape, keywords)), re.IGNORECASE)
+
+
+def _parse_amount(val):
+    """Parse an amount cell such as 'Rs 1,234.50'; blank or unparseable cells are 0.0."""
+    # Text cells are the common case and cannot be missing, so skip pd.isna for them
+    if not isinstance(val, str):
+        if pd.isna(val):
+            return 0.0
+        val = str(val)
+    s = val.translate(_ASCII_AMOUNT_TABLE)
+    if not s.isascii():
+        s = _AMOUNT_SCRUB_RE.sub('', s)
+    if s.replace('.', '', 1).isdigit() or _AMOUNT_NUMBER_RE.fullmatch(s):
+        return float(s)
+    return 0.0
+
+
+def _parse_amount_column(column):
+    """
+    Parse a column of amount cells. Numeric columns are converted directly;
+    floats whose text form is exponent notation keep the per-cell parse.
+    """
+    if column is None:
+        return None
+    if not pd.api.types.is_numeric_dtype(column) or pd.api.types.is_bool_dtype(column):
+        return [_parse_amount(v) for v in column.tolist()]
+    numbers = column.to_numpy(dtype=float, na_value=np.nan)
+    missing = np.isnan(numbers)
+    amounts = np.where(missing, 0.0, numbers).tolist()
+    if pd.api.types.is_integer_dtype(column):
+        return amounts
+    magnitudes = np.abs(numbers)
+    plain = ((magnitudes >= 1e-4) & (magnitudes < 1e16)) | (numbers == 0) | missing
+    for i in np.flatnonzero(~plain).tolist():
+        amounts[i] = _parse_amount(numbers[i])
+    return amounts
+
+
+def _clean_descriptions(values):
+    """
+    Flatten a column of narration cells to single-line text. Repeated narrations
+    come back as one shared string, so the party cache hits on identity.
+    """
+    cleaned = {}
+    descriptions = []
+    for val in values:
+        if pd.isna(val):
+            descriptions.append('')
+            continue
+        text = str(val)
+        description = cleaned.get(text)
+        if description is None:
+            description = cleaned[text] = text.replace('\n', ' ').strip()
+        descriptions.append(description)
+    return descriptions
+
+
+def _column(df, name):
+    """A normalized column, or None when the sheet lacks it; the first of duplicate headers wins."""
+    if name not in df.columns:
+        return None
+    column = df[name]
+    if isinstance(column, pd.DataFrame):
+        column = column.iloc[:, 0]
+    return column
+
 
 class ExcelProcessor:
     def __init__(self):
         # ========== COMPREHENSIVE UPI PATTERNS ==========
         # All possible UPI transaction formats from Indian banks
-        self.upi_patterns = [
+        self.upi_patterns = _compile_patterns([
             # Standard formats: UPI/CR/REF/PARTY/OK, UPI/DR/REF/PARTY/OK
             r'UPI/(?:CR|DR)/\d+/(.+?)/(?:OK|FAIL|PA|BI|AX|BI|PASS)',
             r'UPI/(?:CR|DR)/\d+/(.+?)$',
@@ -38,10 +241,10 @@ class ExcelProcessor:
             r'UPI[/]*(?:CR|DR)?[/]*([A-Z][A-Za-z\s]+?)(?:/OKAX|/OKBI|/OKPA|/OK|/PA|/BI|/PAYPASS|$)',
             r'UPI[/\s]*(?:CR|DR)?[/\s]*(?:D\d+)?[/\s]*([A-Z0-9]+(?:\s*[A-Z0-9]+)?)(?:/OKAX|/OKBI|/OKPA|/OK|/PA|/BI|/PAYPASS|$)',
             r'UPI[/\s]*(?:CR|DR)?[/\s]*(?:D\d+)?[/\s]*([A-Z][A-Za-z\s]+?)(?:/OKPA|/GPAYBILLPAY)',
-        ]
+        ])
         
         # ========== RTGS PATTERNS ==========
-        self.rtgs_patterns = [
+        self.rtgs_patterns = _compile_patterns([
             # RTGS CR-123456- PARTYNAME -123456
             r'RTGS\s+CR[-]\s*[A-Z0-9]+[-]\s*([A-Z][A-Za-z\s]+?)(?:[-]\s*[A-Z0-9]|$)',
             r'RTGS\s+(?:CR|DR)[-]\s*([A-Z][A-Za-z\s]+?)(?:[-]|$)',
@@ -50,10 +253,10 @@ class ExcelProcessor:
             r'RTGS[/\s]+(?:transfer|TRF)?[/\s]*([A-Z][A-Za-z\s]+?)(?:\s*$|,)',
             # RTGS with ref numbers
             r'RTGS\s+(?:CR|DR)?\s*[A-Z0-9/\-]*\s*([A-Z][A-Za-z\s]{2,})',
-        ]
+        ])
         
         # ========== NEFT PATTERNS ==========
-        self.neft_patterns = [
+        self.neft_patterns = _compile_patterns([
             # NEFT CR-123456- PARTYNAME -123456
             r'NEFT\s+CR[-]\s*[A-Z0-9]+[-]\s*([A-Z][A-Za-z\s]+?)(?:[-]|$)',
             r'NEFT\s+(?:CR|DR)[-]\s*[A-Z0-9]+[-]\s*([A-Z][A-Za-z\s]+?)(?:[-]|$)',
@@ -62,10 +265,10 @@ class ExcelProcessor:
             r'NEFT[/\s]+(?:transfer|TRF)?[/\s]*([A-Z][A-Za-z\s]+?)(?:\s*$|,)',
             # NEFT with ref numbers
             r'NEFT\s+(?:CR|DR)?\s*[A-Z0-9/\-]*\s*([A-Z][A-Za-z\s]{2,})',
-        ]
+        ])
         
         # ========== IMPS PATTERNS ==========
-        self.imps_patterns = [
+        self.imps_patterns = _compile_patterns([
             # IMPS CR-123456- PARTYNAME -123456
             r'IMPS\s+(?:CR|DR)[-]\s*[A-Z0-9]+[-]\s*([A-Z][A-Za-z\s]+?)(?:[-]|$)',
             # IMPS from/to formats
@@ -75,10 +278,10 @@ class ExcelProcessor:
             r'IMPS[/\s]+(?:transfer|TRF)?[/\s]*([A-Z][A-Za-z\s]+?)(?:\s*$|,)',
             # IMPS with ref numbers
             r'IMPS\s+(?:CR|DR)?\s*[A-Z0-9/\-]*\s*([A-Z][A-Za-z\s]{2,})',
-        ]
+        ])
         
         # ========== GENERIC TRANSFER PATTERNS ==========
-        self.transfer_patterns = [
+        self.transfer_patterns = _compile_patterns([
             r'(?:transfer|TRANSFER)\s+(?:from|to|FROM|TO)\s+([A-Z][A-Za-z\s]{2,})(?:\s*$|,)',
             r'PAID\s+TO\s+([A-Z][A-Za-z\s]{2,})(?:\s*$|,)',
             r'RECEIVED\s+FROM\s+([A-Z][A-Za-z\s]{2,})(?:\s*$|,)',
@@ -86,38 +289,38 @@ class ExcelProcessor:
             r'TRF\s+(?:TO|FROM)[:\s]*([A-Z][A-Za-z\s]{2,})(?:\s*$|,)',
             r'TRANSFER\s+(?:TO|FROM)?\s*([A-Z][A-Za-z\s]{2,})(?:\s*$|,)',
             r'Payment\s+(?:to|from)?\s*([A-Z][A-Za-z\s]{2,})(?:\s*$|,)',
-        ]
+        ])
         
         # ========== CASH PATTERNS ==========
-        self.cash_patterns = [
+        self.cash_patterns = _compile_patterns([
             r'CASH\s+DEPOSIT\s+(?:AT|BY)?\s*([A-Z][A-Za-z\s]{2,})(?:\s*$|,)',
             r'CASH\s+(?:DEPOSIT|WITHDRAWAL)[-]\s*([A-Z][A-Za-z\s]{2,})(?:\s*$|,)',
             r'CASH\s+BY\s+([A-Z][A-Za-z\s]{2,})(?:\s*$|,)',
             r'CASH\s+(?:DEPOSIT|WITHDRAWAL)\s+(?:AT)?\s*([A-Z][A-Za-z\s]{2,})',
-        ]
+        ])
         
         # ========== BILL/EMI PATTERNS ==========
-        self.bill_patterns = [
+        self.bill_patterns = _compile_patterns([
             r'(?:BILL|EMI|LOAN)\s+(?:PAYMENT|REPAYMENT)[:\s]*([A-Z][A-Za-z\s]{2,})(?:\s*$|,)',
             r'(?:BILL|EMI)\s+(?:FOR|TO)?\s*([A-Z][A-Za-z\s]{2,})(?:\s*$|,)',
             r'(?:CREDIT\s+CARD|DEBIT\s+CARD)\s+BILL[:\s]*([A-Z][A-Za-z\s]{2,})(?:\s*$|,)',
             r'INSURANCE\s+(?:PREMIUM|PAYMENT)[:\s]*([A-Z][A-Za-z\s]{2,})(?:\s*$|,)',
             r'(?:BILL|PAYMENT)\s+(?:FOR|TO)?\s*([A-Z][A-Za-z\s]{2,})',
-        ]
+        ])
         
         # ========== SALARY/INTEREST PATTERNS ==========
-        self.salary_patterns = [
+        self.salary_patterns = _compile_patterns([
             r'SALARY\s+(?:FROM|TO)?\s*([A-Z][A-Za-z\s]{2,})(?:\s*$|,)',
             r'INTEREST\s+(?:FROM|ON)?\s*([A-Z][A-Za-z\s]{2,})(?:\s*$|,)',
             r'DIVIDEND\s+(?:FROM)?\s*([A-Z][A-Za-z\s]{2,})',
-        ]
+        ])
         
         # ========== CHEQUE PATTERNS ==========
-        self.cheque_patterns = [
+        self.cheque_patterns = _compile_patterns([
             r'CHEQUE\s+(?:PAYMENT|DEPOSIT|CLEARING)[:\s-]*([A-Z][A-Za-z\s]{2,})',
             r'CHQ[:\s-]*([A-Z][A-Za-z\s]{2,})',
             r'CHEQUE\s+NO[:\s]*\d+\s*(?:DRAWN\s+ON)?\s*([A-Z][A-Za-z\s]{2,})',
-        ]
+        ])
         
         # ========== COMMON BUSINESS SUFFIXES ==========
         self.business_suffixes = [
@@ -127,92 +330,99 @@ class ExcelProcessor:
             'bank', 'banking', 'holdings', 'fintech', 'payments', 'industries',
             'constructions', 'developers', 'realty', 'estates', 'stores', 'retail',
         ]
+        self._suffix_re = re.compile(
+            r'\b(?:' + '|'.join(map(re.escape, self.business_suffixes)) + r')\b', re.IGNORECASE
+        )
+        
+        # Pattern groups in priority order, each gated by the keywords its patterns require
+        self.pattern_groups = [
+            (_keyword_re('UPI', '@'), self.upi_patterns, 'UPI'),
+            (_keyword_re('RTGS'), self.rtgs_patterns, 'RTGS'),
+            (_keyword_re('NEFT'), self.neft_patterns, 'NEFT'),
+            (_keyword_re('IMPS'), self.imps_patterns, 'IMPS'),
+            (_keyword_re('TRANSFER', 'PAID', 'RECEIVED', 'NEFT', 'RTGS', 'IMPS', 'TRF', 'PAYMENT'),
+             self.transfer_patterns, 'Transfer'),
+            (_keyword_re('CHEQUE', 'CHQ'), self.cheque_patterns, 'Cheque'),
+            (_keyword_re('CASH'), self.cash_patterns, 'Cash'),
+            (_keyword_re('BILL', 'EMI', 'LOAN', 'INSURANCE', 'PAYMENT'), self.bill_patterns, 'Bill'),
+            (_keyword_re('SALARY', 'INTEREST', 'DIVIDEND'), self.salary_patterns, 'Salary'),
+        ]
+        # Every group pattern captures the party in group 1
+        assert all(p.groups >= 1 for _, patterns, _ in self.pattern_groups for p in patterns)
         
-        # ========== KNOWN MERCHANTS ==========
-        self.merchant_patterns = {
-            r'\buber\b': 'UBER', 
-            r'\bola\b': 'OLA', 
-            r'\bswiggy\b': 'SWIGGY',
-            r'\bzomato\b': 'ZOMATO', 
-            r'\bamazon\b': 'AMAZON', 
-            r'\bflipkart\b': 'FLIPKART',
-            r'\bmyntra\b': 'MYNTRA', 
-            r'\boyo\b': 'OYO', 
-            r'\birctc\b': 'IRCTC',
-            r'\bmakemytrip\b': 'MAKE MY TRIP', 
-            r'\bredbus\b': 'REDBUS',
-            r'\bpaytm\b': 'PAYTM', 
-            r'\bphonepe\b': 'PHONEPE', 
-            r'\bgpay\b': 'GPAY',
-            r'\bbhim\b': 'BHIM', 
-            r'\bgoogle\b': 'GOOGLE',
-            r'\bnetflix\b': 'NETFLIX', 
-            r'\bspotify\b': 'SPOTIFY',
-            r'\bprime\b': 'PRIME VIDEO',
-            r'\bhotstar\b': 'HOTSTAR',
-            r'\bbookmyshow\b': 'BOOKMYSHOW',
-            r'\bdominos\b': 'DOMINO\'S',
-            r'\bpizzahut\b': 'PIZZA HUT',
-            r'\bkfc\b': 'KFC',
-            r'\bmcdonalds\b': 'MCDONALD\'S',
-            r'\bswiggy\b': 'SWIGGY',
-            r'\bzomato\b': 'ZOMATO',
-            r'\bsblink\b': 'BLINKIT',
-            r'\bzepto\b': 'ZEPTO',
-            r'\bdunzo\b': 'DUNZO',
-            r'\bsnapdeal\b': 'SNAPDEAL',
-            r'\bmyntra\b': 'MYNTRA',
-            r'\bajio\b': 'AJIO',
-            r'\bnykaa\b': 'NYKAA',
-            r'\bpurplle\b': 'PURPLLE',
-        }
-        
-        # ========== BANK IFSC MAPPING ==========
-        self.bank_from_ifsc = {
-            'BDBL': 'Bandhan Bank', 'HDFC': 'HDFC Bank', 'SBIN': 'State Bank of India',
-            'ICIC': 'ICICI Bank', 'AXIS': 'Axis Bank', 'KKBK': 'Kotak Mahindra Bank',
-            'YESB': 'Yes Bank', 'IDFB': 'IDFC First Bank', 'CNRB': 'Canara Bank',
-            'UTIB': 'Axis Bank', 'HDFC': 'HDFC Bank', 'ICIC': 'ICICI Bank',
-            'SBIN': 'SBI', 'BARB': 'Bank of Baroda', 'PUNB': 'Punjab National Bank',
-            'ORBC': 'Oriental Bank', 'VIJB': 'Vijaya Bank', 'BKID': 'Bank of India',
-            'MAHB': 'Bank of Maharashtra', 'IDIB': 'Indian Bank', 'SYNB': 'Syndicate Bank',
-            'CBIN': 'Central Bank', 'RATN': 'RBL Bank', 'YESB': 'Yes Bank',
-        }
-        
-        self.party_cache = {}
         self.date_formats = ['%d-%b-%Y', '%d-%b-%y', '%d/%m/%Y', '%d-%m-%Y', '%Y-%m-%d']
+        
+        # Party extraction depends only on the narration; statements repeat them heavily
+        self._extract_party_cached = lru_cache(maxsize=65536)(self._extract_party_cached)
     
-    def extract_transactions(self, file_content: bytes, filename: str = ""):
+    def extract_transactions(self, file_content, filename: str = "", executor=None):
+        """
+        Extract transactions and the account profile from a workbook.
+        file_content is either raw bytes or a seekable binary file object.
+        With a process pool executor, the sheets of a multi-sheet workbook are
+        extracted in parallel.
+        """
         transactions = []
         account_profile = {}
         
         try:
-            excel_file = pd.ExcelFile(io.BytesIO(file_content))
+            if isinstance(file_content, (bytes, bytearray)):
+                file_content = io.BytesIO(file_content)
+            else:
+                file_content.seek(0)
+            excel_file = pd.ExcelFile(file_content)
+            sheet_names = excel_file.sheet_names
             
-            for sheet_name in excel_file.sheet_names:
+            results = None
+            if executor is not None and len(sheet_names) > 1:
+                file_content.seek(0)
+                workbook = file_content.read()
                 try:
-                    df = pd.read_excel(excel_file, sheet_name=sheet_name, header=None)
-                    account_profile = self._extract_account_profile(df)
-                    
-                    header_row = self._detect_header_row(df)
-                    if header_row is None:
-                        continue
-                    
-                    df = pd.read_excel(excel_file, sheet_name=sheet_name, header=header_row)
-                    df.columns = [str(c).replace('\n', ' ').strip() if pd.notna(c) else c for c in df.columns]
-                    df = self._normalize_columns(df)
-                    
-                    sheet_transactions = self._extract_from_dataframe(df, filename, sheet_name)
-                    transactions.extend(sheet_transactions)
-                except Exception as e:
-                    logger.warning(f"Error in sheet '{sheet_name}': {e}")
-                    continue
+                    results = list(executor.map(
+                        _extract_sheet_in_worker, repeat(workbook), sheet_names, repeat(filename)
+                    ))
+                except (BrokenProcessPool, OSError) as e:
+                    # A dead worker should not drop the whole workbook; read the sheets here
+                    logger.warning(f"Sheet workers failed, extracting sequentially: {e}")
+            if results is None:
+                results = (self._extract_sheet(excel_file, sheet_name, filename) for sheet_name in sheet_names)
+            
+            for sheet_profile, sheet_transactions in results:
+                if sheet_profile is not None:
+                    account_profile = sheet_profile
+                transactions.extend(sheet_transactions)
         except Exception as e:
             logger.error(f"Error reading file: {e}")
             return [], {}
         
         return transactions, account_profile
     
+    def _extract_sheet(self, excel_file, sheet_name, filename):
+        """
+        Extract one sheet. Returns (account_profile, transactions); the profile
+        is None when the sheet could not be read at all.
+        """
+        account_profile = None
+        try:
+            df = pd.read_excel(excel_file, sheet_name=sheet_name, header=None)
+            account_profile = self._extract_account_profile(df)
+            
+            header_row = self._detect_header_row(df)
+            if header_row is None:
+                return account_profile, []
+            
+            df = self._frame_below_header(df, header_row)
+            df.columns = [str(c).replace('\n', ' ').strip() if pd.notna(c) else c for c in df.columns]
+            df = self._normalize_columns(df)
+            # The header text kept every column as object; re-infer dtypes as
+            # a headed read would, but only for the columns that are used
+            df = df.infer_objects()
+            
+            return account_profile, self._extract_from_dataframe(df, filename, sheet_name)
+        except Exception as e:
+            logger.warning(f"Error in sheet '{sheet_name}': {e}")
+            return account_profile, []
+    
     def _extract_account_profile(self, df):
         account_profile = {}
         header_text = ""
@@ -221,13 +431,8 @@ class ExcelProcessor:
             header_text += " " + " ".join(row_values)
         header_text = header_text.upper()
         
-        patterns = [
-            r'(?:ACCOUNT\s*TITLE[:\s]*)([A-Z][A-Z\s]{2,50})',
-            r'(?:ACCOUNT\s*HOLDER[:\s]*)([A-Z][A-Z\s]{2,50})',
-            r'(?:NAME[:\s]*)([A-Z][A-Z\s]{2,50})',
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, header_text)
+        for pattern in _ACCOUNT_HOLDER_PATTERNS:
+            match = pattern.search(header_text)
             if match:
                 name = match.group(1).strip()
                 name = ' '.join(name.split())
@@ -235,27 +440,38 @@ class ExcelProcessor:
                     account_profile['account_holder_name'] = name
                     break
         
-        match = re.search(r'(?:ACCOUNT|NO\.?)[:\s#]*([A-Z0-9]{5,20})', header_text)
+        match = _ACCOUNT_NUMBER_RE.search(header_text)
         if match:
             account_profile['account_number'] = match.group(1)
         
-        match = re.search(r'(?:IFSC[:\s]*)([A-Z]{4}[0-9]{7})', header_text)
+        match = _IFSC_RE.search(header_text)
         if match:
             ifsc = match.group(1)
             account_profile['ifsc_code'] = ifsc
             bank_prefix = ifsc[:4]
-            if bank_prefix in self.bank_from_ifsc:
-                account_profile['bank_name'] = self.bank_from_ifsc[bank_prefix]
+            if bank_prefix in _BANK_FROM_IFSC:
+                account_profile['bank_name'] = _BANK_FROM_IFSC[bank_prefix]
         
         return account_profile
     
+    def _frame_below_header(self, raw, header_row):
+        """
+        Rebuild the table under the detected header from the header-less read,
+        instead of parsing the sheet a second time with header=header_row.
+        """
+        df = raw.iloc[header_row + 1:].reset_index(drop=True)
+        df.columns = raw.iloc[header_row].tolist()
+        return df
+    
     def _detect_header_row(self, df):
-        keywords = ['date', 'description', 'credit', 'debit', 'balance', 'narration', 'amount']
-        for idx, row in df.iterrows():
-            row_str = ' '.join([str(v).replace('\n', ' ') for v in row.values if pd.notna(v)]).lower()
-            matches = sum(1 for kw in keywords if kw in row_str)
-            if matches >= 2:
-                return idx
+        for idx, row in zip(df.index, df.head(HEADER_SCAN_ROWS).itertuples(index=False, name=None)):
+            row_str = ' '.join([str(v) for v in row if pd.notna(v)]).lower()
+            matches = 0
+            for kw in _HEADER_KEYWORDS:
+                if kw in row_str:
+                    matches += 1
+                    if matches >= 2:
+                        return idx
         return None
     
     def _normalize_columns(self, df):
@@ -263,24 +479,10 @@ class ExcelProcessor:
         used_types = set()
         
         for col in df.columns:
-            col_str = str(col).strip()
-            col_lower = col_str.lower()
-            
-            if col_lower in ['date', 'trans date', 'txn date', 'posting date'] and 'date' not in used_types:
-                new_columns[col] = 'date'
-                used_types.add('date')
-            elif col_lower in ['description', 'narration', 'particulars', 'details', 'remarks'] and 'description' not in used_types:
-                new_columns[col] = 'description'
-                used_types.add('description')
-            elif col_lower in ['credit', 'credits', 'cr', 'deposit', 'deposits'] and 'credit' not in used_types:
-                new_columns[col] = 'credit'
-                used_types.add('credit')
-            elif col_lower in ['debit', 'debits', 'dr', 'withdrawal', 'withdrawals'] and 'debit' not in used_types:
-                new_columns[col] = 'debit'
-                used_types.add('debit')
-            elif col_lower in ['balance', 'bal', 'closing balance'] and 'balance' not in used_types:
-                new_columns[col] = 'balance'
-                used_types.add('balance')
+            col_type = COLUMN_ALIASES.get(str(col).strip().lower())
+            if col_type and col_type not in used_types:
+                new_columns[col] = col_type
+                used_types.add(col_type)
         
         df = df.rename(columns=new_columns)
         
@@ -291,68 +493,72 @@ class ExcelProcessor:
         
         return df[final_cols] if final_cols else df
     
+    def _format_date(self, date_str):
+        for fmt in self.date_formats:
+            try:
+                return datetime.strptime(date_str, fmt).strftime('%d/%m/%Y')
+            except ValueError:
+                continue
+        return date_str
+    
+    def _format_dates(self, values):
+        """
+        Format a column of date cells as DD/MM/YYYY, keeping unrecognised text as is.
+        Statements repeat each date many times, so every distinct text is parsed once.
+        """
+        formatted = {}
+        dates = []
+        for date_val in values:
+            if pd.isna(date_val):
+                dates.append(None)
+                continue
+            date_str = str(date_val).replace('\n', ' ').strip()
+            date = formatted.get(date_str)
+            if date is None:
+                date = formatted[date_str] = self._format_date(date_str)
+            dates.append(date)
+        return dates
+    
     def _extract_from_dataframe(self, df, filename, sheet_name):
         transactions = []
         
-        for idx, row in df.iterrows():
-            try:
-                date_val = row.get('date')
-                date = None
-                if pd.notna(date_val):
-                    date_str = str(date_val).replace('\n', ' ').strip()
-                    for fmt in self.date_formats:
-                        try:
-                            date = datetime.strptime(date_str, fmt).strftime('%d/%m/%Y')
-                            break
-                        except:
-                            continue
-                    if not date:
-                        date = date_str
-                
-                desc_val = row.get('description')
-                description = str(desc_val).replace('\n', ' ').strip() if pd.notna(desc_val) else ''
-                
-                def get_amount(val):
-                    if pd.isna(val):
-                        return 0.0
-                    s = str(val).replace('\n', ' ').strip()
-                    s = re.sub(r'[Rs$,\s]', '', s)
-                    s = re.sub(r'[^0-9.-]', '', s)
-                    try:
-                        return float(s) if s else 0.0
-                    except:
-                        return 0.0
-                
-                credit = get_amount(row.get('credit'))
-                debit = get_amount(row.get('debit'))
-                balance = get_amount(row.get('balance'))
-                amount = credit if credit > 0 else (-debit if debit > 0 else 0)
-                
-                if not date and not description and amount == 0:
-                    continue
-                
-                detected_party = self._extract_party_name(description)
-                
-                # Set both party and detected_party for frontend compatibility
-                party = detected_party if detected_party else None
-                
-                transactions.append({
-                    'date': date,
-                    'description': description.strip(),
-                    'amount': amount,
-                    'credit': credit,
-                    'debit': debit,
-                    'balance': balance,
-                    'source_file': filename,
-                    'source_sheet': sheet_name,
-                    'party': party,
-                    'detected_party': party,
-                    'is_transfer': any(kw in description.lower() for kw in ['neft', 'imps', 'rtgs', 'transfer', 'trf', 'by transfer']),
-                    'is_upi': any(kw in description.lower() for kw in ['upi', '@', 'gpay', 'phonepe', 'paytm', 'bhim']),
-                })
-            except Exception as e:
-                logger.debug(f"Row {idx} error: {e}")
+        # Convert whole columns up front; only party extraction runs per row
+        n_rows = len(df)
+        date_col = _column(df, 'date')
+        dates = self._format_dates(date_col.tolist()) if date_col is not None else [None] * n_rows
+        desc_col = _column(df, 'description')
+        descriptions = _clean_descriptions(desc_col.tolist()) if desc_col is not None else [''] * n_rows
+        zeros = [0.0] * n_rows
+        credits = _parse_amount_column(_column(df, 'credit')) or zeros
+        debits = _parse_amount_column(_column(df, 'debit')) or zeros
+        balances = _parse_amount_column(_column(df, 'balance')) or zeros
+        
+        for date, description, credit, debit, balance in zip(dates, descriptions, credits, debits, balances):
+            amount = credit if credit > 0 else (-debit if debit > 0 else 0)
+            
+            if not date and not description and amount == 0:
                 continue
+            
+            detected_party = self._extract_party_name(description)
+            description_lower = description.lower()
+            
+            # Set both party and detected_party for frontend compatibility
+            party = detected_party if detected_party else None
+            
+            transactions.append({
+                'date': date,
+                'description': description,
+                'amount': amount,
+                'credit': credit,
+                'debit': debit,
+                'balance': balance,
+                'source_file': filename,
+                'source_sheet': sheet_name,
+                'party': party,
+                'detected_party': party,
+                'is_transfer': _TRANSFER_FLAG_RE.search(description_lower) is not None,
+                'is_upi': _UPI_FLAG_RE.search(description_lower) is not None,
+            })
         
         return transactions
     
@@ -363,50 +569,33 @@ class ExcelProcessor:
         """
         if not narration or len(narration) < 2:
             return None
-        
+        return self._extract_party_cached(narration[:MAX_NARRATION_LENGTH])
+    
+    def _extract_party_cached(self, narration):
         narration_clean = narration.strip()
-        cache_key = narration_clean.upper()[:100]
-        if cache_key in self.party_cache:
-            return self.party_cache[cache_key]
-        
         party = None
         
         # ========== STEP 1: Check known merchants ==========
-        for pattern, name in self.merchant_patterns.items():
-            if re.search(pattern, narration_clean.lower()):
-                party = name
-                logger.debug(f"Merchant match: '{narration}' -> '{party}'")
-                break
+        merchant_hits = _MERCHANT_RE.findall(narration_clean.lower())
+        if merchant_hits:
+            party = _MERCHANT_NAMES[min(merchant_hits, key=_MERCHANT_RANK.__getitem__)]
+            logger.debug(f"Merchant match: '{narration}' -> '{party}'")
         
         # ========== STEP 2: Try all pattern groups ==========
         if not party:
-            pattern_groups = [
-                (self.upi_patterns, 'UPI'),
-                (self.rtgs_patterns, 'RTGS'),
-                (self.neft_patterns, 'NEFT'),
-                (self.imps_patterns, 'IMPS'),
-                (self.transfer_patterns, 'Transfer'),
-                (self.cheque_patterns, 'Cheque'),
-                (self.cash_patterns, 'Cash'),
-                (self.bill_patterns, 'Bill'),
-                (self.salary_patterns, 'Salary'),
-            ]
-            
-            for group_patterns, ptype in pattern_groups:
+            for group_re, group_patterns, ptype in self.pattern_groups:
+                # Every pattern in a group needs one of its keywords
+                if not group_re.search(narration):
+                    continue
                 for pattern in group_patterns:
-                    match = re.search(pattern, narration, re.IGNORECASE)
-                    if match:
-                        try:
-                            if match.group(1):
-                                candidate = match.group(1).upper().strip()
-                                candidate = ' '.join(candidate.split())
-                                # Validate candidate
-                                if len(candidate) >= 2 and candidate not in ['DR', 'CR', 'TRF', 'BY', 'TO', 'FROM', 'PAID', 'RECEIVED']:
-                                    party = self._normalize_party_name(candidate)
-                                    logger.debug(f"Match ({ptype}): '{narration}' -> '{party}'")
-                                    break
-                        except IndexError:
-                            continue
+                    match = pattern.search(narration)
+                    if match and match.group(1):
+                        candidate = ' '.join(match.group(1).upper().split())
+                        # Validate candidate
+                        if len(candidate) >= 2 and candidate not in _NON_PARTY_WORDS:
+                            party = self._normalize_party_name(candidate)
+                            logger.debug(f"Match ({ptype}): '{narration}' -> '{party}'")
+                            break
                 if party:
                     break
         
@@ -414,9 +603,6 @@ class ExcelProcessor:
         if not party:
             party = self._extract_party_advanced(narration_clean)
         
-        if party:
-            self.party_cache[cache_key] = party
-        
         return party
     
     def _extract_party_advanced(self, narration):
@@ -427,20 +613,12 @@ class ExcelProcessor:
         party = None
         
         # Try to find patterns like "TO PARTYNAME", "FROM PARTYNAME"
-        to_patterns = [
-            r'TO\s+([A-Z][A-Za-z\s]{2,})',
-            r'FOR\s+([A-Z][A-Za-z\s]{2,})',
-            r'ON\s+([A-Z][A-Za-z\s]{2,})',
-            r'AT\s+([A-Z][A-Za-z\s]{2,})',
-        ]
-        
-        for pattern in to_patterns:
-            match = re.search(pattern, narration, re.IGNORECASE)
+        for pattern in _ADVANCED_PATTERNS:
+            match = pattern.search(narration)
             if match:
-                candidate = match.group(1).upper().strip()
-                candidate = ' '.join(candidate.split())
+                candidate = ' '.join(match.group(1).upper().split())
                 # Remove common prefixes/suffixes
-                candidate = re.sub(r'^(TO|FROM|FOR|AT|ON|BY|REF|REFNO|NO|NEW|AC|ACC|ACCOUNT)\s*', '', candidate, flags=re.IGNORECASE)
+                candidate = _ADVANCED_PREFIX_RE.sub('', candidate)
                 if len(candidate) >= 2:
                     party = self._normalize_party_name(candidate)
                     break
@@ -448,14 +626,7 @@ class ExcelProcessor:
         # If still no party, try to extract meaningful words
         if not party:
             # Remove common transaction words
-            cleaned = narration
-            transaction_words = ['DEPOSIT', 'WITHDRAWAL', 'PAYMENT', 'TRANSFER', 'CREDIT', 'DEBIT', 
-                               'BALANCE', 'CHARGES', 'FEE', 'TAX', 'EMI', 'BILL', 'SALARY',
-                               'INTEREST', 'DIVIDEND', 'REFUND', 'REVERSAL', 'CLEARING']
-            for word in transaction_words:
-                cleaned = re.sub(r'\b' + word + r'\b', ' ', cleaned, flags=re.IGNORECASE)
-            
-            words = cleaned.strip().split()
+            words = _TRANSACTION_WORDS_RE.sub(' ', narration).split()
             meaningful = [w for w in words if len(w) > 2 and not w.isdigit()]
             
             if meaningful:
@@ -475,17 +646,16 @@ class ExcelProcessor:
         name = str(name).upper().strip()
         
         # Remove business suffixes
-        for suffix in self.business_suffixes:
-            name = re.sub(rf'\b{suffix}\b', '', name, flags=re.IGNORECASE)
+        name = self._suffix_re.sub('', name)
         
         # Remove long number sequences (likely phone numbers or refs)
-        name = re.sub(r'\b[\d]{10,}\b', '', name)
+        name = _LONG_NUMBER_RE.sub('', name)
         
         # Remove special characters except spaces
-        name = re.sub(r'[^\w\s]', ' ', name)
+        name = _PUNCT_SCRUB_RE.sub(' ', name)
         
         # Remove common prefixes
-        name = re.sub(r'^(?:TO|FROM|FOR|VIA|BY|REF|REFNO|NO|NEW|AC|ACC|ACCOUNT|TRANSFER|TRF)\s*', '', name, flags=re.IGNORECASE)
+        name = _NAME_PREFIX_RE.sub('', name)
         
         # Clean up whitespace
         name = ' '.join(name.split())
@@ -499,5 +669,15 @@ class ExcelProcessor:
         return "UNKNOWN"
     
     def clear_cache(self):
-        self.party_cache.clear()
+        self._extract_party_cached.cache_clear()
+
+
+_worker_processor = None
+
 
+def _extract_sheet_in_worker(workbook: bytes, sheet_name, filename):
+    """Extract one sheet of a workbook in a pool worker, reusing a per-process ExcelProcessor."""
+    global _worker_processor
+    if _worker_processor is None:
+        _worker_processor = ExcelProcessor()
+    return _worker_processor._extract_sheet(pd.ExcelFile(io.BytesIO(workbook)), sheet_name, filename)
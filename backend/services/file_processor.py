@@ -8,6 +8,8 @@ from io import BytesIO
 import logging
 from datetime import datetime
 
+from .excel_processor import COLUMN_ALIASES
+
 logger = logging.getLogger(__name__)
 
 class FileProcessor:
@@ -60,23 +62,8 @@ class FileProcessor:
             df.columns = df.iloc[header_row_idx]
             df = df.iloc[header_row_idx + 1:]
             
-            # Rename columns
-            df = df.rename(columns={
-                'Date': 'date',
-                'Transaction Date': 'date',
-                'Description': 'description',
-                'Narration': 'description',
-                'Particulars': 'description',
-                'Details': 'description',
-                'Credit': 'credit',
-                'Cr': 'credit',
-                'Deposit': 'credit',
-                'Debit': 'debit',
-                'Dr': 'debit',
-                'Withdrawal': 'debit',
-                'Balance': 'balance',
-                'Bal': 'balance'
-            })
+            # Rename columns, matching headers case-insensitively
+            df = df.rename(columns=lambda c: COLUMN_ALIASES.get(str(c).strip().lower(), c))
             
             # Convert to list of dicts
             transactions = df.to_dict('records')
@@ -8,12 +8,90 @@ from dataclasses import dataclass, field
 from collections import defaultdict
 import logging
 from datetime import datetime
+from functools import lru_cache
+import heapq
+import numpy as np
 import re
 
 logger = logging.getLogger(__name__)
 
+# Party extraction from narrations (matched against upper-cased text)
+_PARTY_PATTERNS = [re.compile(p) for p in (
+    r'UPI[/\s]*(?:CR|DR)[/\s]*[\d]+[/\s]*([A-Z\s]+)',
+    r'PAID\s+TO\s+([A-Z\s]+)',
+    r'TRANSFER\s+TO\s+([A-Z\s]+)',
+    r'(?:NEFT|IMPS)\s+(?:DR|CR)?\s*([A-Z\s]+)',
+)]
+_DIGIT_CLEAN_RE = re.compile(r'[0-9#*]+')
 
-@dataclass
+# Business suffixes dropped when normalizing party names
+_PARTY_SUFFIXES = [
+    'TRADERS', 'TRDG', 'TRD', 'AGENCIES', 'AGY', 'ENTERPRISES', 'ENTP',
+    'SERVICES', 'SRV', 'SOLUTIONS', 'SOLN', 'PVT', 'LTD', 'LIMITED',
+    'CORP', 'CORPORATION', 'INC', 'COMPANY', 'CO'
+]
+_SUFFIX_RE = re.compile(r'\b(?:' + '|'.join(_PARTY_SUFFIXES) + r')\b', re.IGNORECASE)
+
+# Date formats by separator, in order of preference. %Y is exactly four digits
+# and %d at most two, so a '-' date is year-first exactly when its first '-' is
+# at index 4.
+_SLASH_DATE_FORMATS = ('%d/%m/%Y', '%m/%d/%Y')
+_YEAR_FIRST_DATE_FORMATS = ('%Y-%m-%d',)
+_DAY_FIRST_DATE_FORMATS = ('%d-%m-%Y',)
+
+# Rounded-amount differences a match may have, in order of preference
+_AMOUNT_OFFSETS = (-1, 0, 1, -2, 2)
+_MAX_AMOUNT_OFFSET = max(abs(offset) for offset in _AMOUNT_OFFSETS)
+# Preference rank of a match, indexed by (other side's amount - own amount) + _MAX_AMOUNT_OFFSET
+_OFFSET_RANK = np.array([
+    _AMOUNT_OFFSETS.index(offset) for offset in range(-_MAX_AMOUNT_OFFSET, _MAX_AMOUNT_OFFSET + 1)
+])
+MAX_MATCHES_PER_TRANSACTION = 5
+# Candidate pairs are expanded this many at a time to bound memory on
+# statements with thousands of same-amount transfers
+_PAIR_CHUNK = 1 << 18
+
+
+@lru_cache(maxsize=4096)
+def _parse_date_cached(date_str: str) -> Optional[datetime]:
+    """Parse a date string; statements reuse a few hundred dates, so each is parsed once."""
+    if not date_str:
+        return None
+    
+    if '/' in date_str:
+        formats = _SLASH_DATE_FORMATS
+    elif date_str.find('-') == 4:
+        formats = _YEAR_FIRST_DATE_FORMATS
+    elif '-' in date_str:
+        formats = _DAY_FIRST_DATE_FORMATS
+    else:
+        return None
+    
+    for fmt in formats:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except:
+            continue
+    
+    return None
+
+
+def _date_ordinal(date_str: str) -> int:
+    """Day number of a date string, or -1 when it does not parse."""
+    parsed = _parse_date_cached(date_str)
+    return parsed.toordinal() if parsed else -1
+
+
+def _run_positions(keys: np.ndarray) -> np.ndarray:
+    """Position of each element within its run of equal keys (keys must be grouped)."""
+    if not len(keys):
+        return keys
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    lengths = np.diff(np.r_[starts, len(keys)])
+    return np.arange(len(keys)) - np.repeat(starts, lengths)
+
+
+@dataclass(slots=True)
 class Transaction:
     """Represents a single transaction."""
     date: str
@@ -27,6 +105,13 @@ class Transaction:
     party: Optional[str] = None
     source_file: Optional[str] = None
     narration: Optional[str] = None
+    # Set by FundFlowChainBuilder.add_transactions: party or "Unknown", its interned
+    # upper-cased id, round(abs(amount)), the key amounts are matched on, and the
+    # date's day number (-1 when it does not parse)
+    party_name: str = field(default="Unknown", repr=False, compare=False)
+    party_id: int = field(default=-1, repr=False, compare=False)
+    amount_key: int = field(default=0, repr=False, compare=False)
+    date_ordinal: int = field(default=-1, repr=False, compare=False)
     
     def __hash__(self):
         return hash((self.date, self.description, self.amount))
@@ -39,7 +124,7 @@ class Transaction:
                 self.amount == other.amount)
 
 
-@dataclass
+@dataclass(slots=True)
 class FundFlowChain:
     """Represents a chain of money flow between parties."""
     chain_id: str
@@ -50,6 +135,10 @@ class FundFlowChain:
     cross_pdf_links: int
     transactions: List[Transaction] = field(default_factory=list)
     flow_path_list: List[str] = field(default_factory=list)
+    flow_path_upper: str = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.flow_path_upper = self.flow_path.upper()
 
 
 class FundFlowChainBuilder:
@@ -60,8 +149,12 @@ class FundFlowChainBuilder:
     def __init__(self):
         self.transactions: List[Transaction] = []
         self.chains: List[FundFlowChain] = []
+        # Positions in self.chains per upper-cased flow path; many chains share a path
+        self._chain_positions_by_path: Dict[str, List[int]] = defaultdict(list)
+        self._reset_chain_stats()
         self.party_transactions: Dict[str, List[Transaction]] = defaultdict(list)
         self.source_files: Set[str] = set()
+        self._party_ids: Dict[str, int] = {}
         
         # Correlation thresholds
         self.AMOUNT_TOLERANCE = 2.0
@@ -88,6 +181,10 @@ class FundFlowChainBuilder:
                     narration=txn_data.get('description', '')
                 )
                 
+                txn.party_name = txn.party or "Unknown"
+                txn.party_id = self._intern_party(txn.party_name)
+                txn.amount_key = round(abs(txn.amount))
+                txn.date_ordinal = _date_ordinal(txn.date)
                 self.transactions.append(txn)
                 
                 party = txn.party or self._extract_party_from_narration(txn.description)
@@ -95,9 +192,17 @@ class FundFlowChainBuilder:
                     self.party_transactions[party.upper()].append(txn)
                     
             except Exception as e:
-                logger.warning(f"Error creating transaction: {e}")
+                logger.warning("Error creating transaction: %s", e)
                 continue
     
+    def _intern_party(self, party_name: str) -> int:
+        """Small integer id per party; names differing only in case share an id."""
+        key = party_name.upper()
+        party_id = self._party_ids.get(key)
+        if party_id is None:
+            party_id = self._party_ids[key] = len(self._party_ids)
+        return party_id
+    
     def _extract_party_from_narration(self, narration: str) -> Optional[str]:
         """Extract party name from narration."""
         if not narration:
@@ -105,18 +210,11 @@ class FundFlowChainBuilder:
         
         narration = str(narration).upper()
         
-        patterns = [
-            r'UPI[/\s]*(?:CR|DR)[/\s]*[\d]+[/\s]*([A-Z\s]+)',
-            r'PAID\s+TO\s+([A-Z\s]+)',
-            r'TRANSFER\s+TO\s+([A-Z\s]+)',
-            r'(?:NEFT|IMPS)\s+(?:DR|CR)?\s*([A-Z\s]+)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, narration)
+        for pattern in _PARTY_PATTERNS:
+            match = pattern.search(narration)
             if match:
                 party = match.group(1).strip()
-                party = re.sub(r'[0-9#*]+', '', party)
+                party = _DIGIT_CLEAN_RE.sub('', party)
                 party = ' '.join(party.split())
                 if len(party) >= 2:
                     return party
@@ -130,21 +228,15 @@ class FundFlowChainBuilder:
         
         name = str(name).upper().strip()
         
-        suffixes = [
-            'TRADERS', 'TRDG', 'TRD', 'AGENCIES', 'AGY', 'ENTERPRISES', 'ENTP',
-            'SERVICES', 'SRV', 'SOLUTIONS', 'SOLN', 'PVT', 'LTD', 'LIMITED',
-            'CORP', 'CORPORATION', 'INC', 'COMPANY', 'CO'
-        ]
-        
-        for suffix in suffixes:
-            name = re.sub(r'\b' + suffix + r'\b', '', name, flags=re.IGNORECASE).strip()
-        
+        name = _SUFFIX_RE.sub('', name)
         name = ' '.join(name.split())
         return name
     
     def build_chains(self):
         """Build fund flow chains from transactions."""
         self.chains = []
+        self._chain_positions_by_path.clear()
+        self._reset_chain_stats()
         
         if not self.transactions:
             return
@@ -152,153 +244,150 @@ class FundFlowChainBuilder:
         credits = [t for t in self.transactions if t.credit > 0]
         debits = [t for t in self.transactions if t.debit > 0]
         
-        credit_by_amount = self._group_by_amount(credits)
-        debit_by_amount = self._group_by_amount(debits)
+        forward_pairs, reverse_pairs = self._match_pairs(credits, debits)
         
         chain_id = 0
-        visited_pairs = set()
         
-        for debit in debits:
-            debit_party = debit.party or "Unknown"
-            
-            matching_credits = self._find_matching_credits(
-                debit.amount, debit.date, debit_party, debit, credit_by_amount, visited_pairs
+        for debit_idx, credit_idx in forward_pairs:
+            chain = self._build_single_chain(
+                debits[debit_idx], credits[credit_idx], chain_id
             )
-            
-            if matching_credits:
-                for credit in matching_credits:
-                    chain = self._build_single_chain(
-                        debit, credit, chain_id, visited_pairs
-                    )
-                    if chain:
-                        self.chains.append(chain)
-                        chain_id += 1
-        
-        for credit in credits:
-            credit_party = credit.party or "Unknown"
-            
-            matching_debits = self._find_matching_debits(
-                credit.amount, credit.date, credit_party, credit, debit_by_amount, visited_pairs
+            if chain:
+                self._add_chain(chain)
+                chain_id += 1
+        
+        for credit_idx, debit_idx in reverse_pairs:
+            chain = self._build_reverse_chain(
+                credits[credit_idx], debits[debit_idx], chain_id
             )
-            
-            for debit in matching_debits:
-                chain = self._build_reverse_chain(
-                    credit, debit, chain_id, visited_pairs
-                )
-                if chain:
-                    self.chains.append(chain)
-                    chain_id += 1
+            if chain:
+                self._add_chain(chain)
+                chain_id += 1
         
-        logger.info(f"Built {len(self.chains)} fund flow chains")
+        logger.info("Built %d fund flow chains", len(self.chains))
     
-    def _group_by_amount(self, transactions: List[Transaction]) -> Dict[float, List[Transaction]]:
-        """Group transactions by amount for quick lookup."""
-        groups = defaultdict(list)
-        for txn in transactions:
-            amount = round(abs(txn.amount))
-            groups[amount].append(txn)
-        return dict(groups)
+    def _reset_chain_stats(self):
+        """Zero the running totals behind get_chain_summary."""
+        self._total_amount = 0
+        self._max_depth = 0
+        self._total_cross_file = 0
+        self._total_depth = 0
+        # Min-heap of (total_amount, -position) for the ten largest chains; on equal
+        # amounts the earlier chain ranks higher
+        self._top_chain_heap: List[tuple] = []
     
-    def _find_matching_credits(
-        self, 
-        debit_amount: float,
-        debit_date: str,
-        debit_party: str,
-        debit: Transaction,
-        credit_by_amount: Dict[float, List[Transaction]],
-        visited_pairs: Set[tuple]
-    ) -> List[Transaction]:
-        """Find credits that could be sources for this debit."""
-        matches = []
-        amount = round(abs(debit_amount))
-        
-        for amt_key in [amount - 1, amount, amount + 1, amount - 2, amount + 2]:
-            if amt_key in credit_by_amount:
-                for credit in credit_by_amount[amt_key]:
-                    pair = (id(credit), id(debit))
-                    if pair in visited_pairs:
-                        continue
-                    
-                    if self._is_date_proximate(debit_date, credit.date):
-                        credit_party = credit.party or "Unknown"
-                        if credit_party.upper() != debit_party.upper():
-                            matches.append(credit)
-        
-        return matches[:5]
+    def _add_chain(self, chain: FundFlowChain):
+        """Append a chain, index it by flow path and fold it into the summary totals."""
+        position = len(self.chains)
+        self._chain_positions_by_path[chain.flow_path_upper].append(position)
+        self.chains.append(chain)
+        
+        self._total_amount += chain.total_amount
+        if chain.chain_depth > self._max_depth:
+            self._max_depth = chain.chain_depth
+        self._total_cross_file += chain.cross_pdf_links
+        self._total_depth += chain.chain_depth
+        if len(self._top_chain_heap) < 10:
+            heapq.heappush(self._top_chain_heap, (chain.total_amount, -position))
+        else:
+            heapq.heappushpop(self._top_chain_heap, (chain.total_amount, -position))
     
-    def _find_matching_debits(
-        self,
-        credit_amount: float,
-        credit_date: str,
-        credit_party: str,
-        credit: Transaction,
-        debit_by_amount: Dict[float, List[Transaction]],
-        visited_pairs: Set[tuple]
-    ) -> List[Transaction]:
-        """Find debits that could be recipients of this credit."""
-        matches = []
-        amount = round(abs(credit_amount))
-        
-        for amt_key in [amount - 1, amount, amount + 1, amount - 2, amount + 2]:
-            if amt_key in debit_by_amount:
-                for debit in debit_by_amount[amt_key]:
-                    pair = (id(credit), id(debit))
-                    if pair in visited_pairs:
-                        continue
-                    
-                    if self._is_date_proximate(credit_date, debit.date):
-                        debit_party = debit.party or "Unknown"
-                        if debit_party.upper() != credit_party.upper():
-                            matches.append(debit)
-        
-        return matches[:5]
+    def _columns(self, transactions: List[Transaction]):
+        """Rounded amounts, date ordinals (-1 when unparseable) and party ids as arrays."""
+        amounts = np.array([t.amount_key for t in transactions], dtype=float)
+        dates = np.array([t.date_ordinal for t in transactions], dtype=np.int64)
+        parties = np.array([t.party_id for t in transactions], dtype=np.int64)
+        return amounts, dates, parties
+    
+    def _match_pairs(self, credits: List[Transaction], debits: List[Transaction]):
+        """
+        Match debits with credits whose rounded amount is within _MAX_AMOUNT_OFFSET,
+        whose date is within DATE_TOLERANCE_DAYS and whose party differs.
+        
+        Each debit is chained to its best MAX_MATCHES_PER_TRANSACTION credits
+        (closest amount first, then statement order); each credit then adds its
+        best debits among the pairs not chained yet. Returns the (debit, credit)
+        and (credit, debit) index pairs, in chain order.
+        """
+        credit_amounts, credit_dates, credit_parties = self._columns(credits)
+        debit_amounts, debit_dates, debit_parties = self._columns(debits)
+        
+        by_amount = np.argsort(credit_amounts, kind='stable')
+        sorted_amounts = credit_amounts[by_amount]
+        window_start = np.searchsorted(sorted_amounts, debit_amounts - _MAX_AMOUNT_OFFSET, 'left')
+        window_sizes = np.searchsorted(sorted_amounts, debit_amounts + _MAX_AMOUNT_OFFSET, 'right') - window_start
+        window_ends = np.cumsum(window_sizes)
+        
+        forward = []
+        spare_credits = spare_ranks = spare_debits = np.empty(0, dtype=np.int64)
+        start = 0
+        while start < len(debits):
+            done = window_ends[start - 1] if start else 0
+            stop = max(int(np.searchsorted(window_ends, done + _PAIR_CHUNK, 'right')), start + 1)
+            
+            # Every (debit, credit) pair inside the debits' amount windows
+            sizes = window_sizes[start:stop]
+            d = np.repeat(np.arange(start, stop), sizes)
+            c = by_amount[np.repeat(window_start[start:stop] - (np.cumsum(sizes) - sizes), sizes) + np.arange(len(d))]
+            start = stop
+            
+            offset = credit_amounts[c] - debit_amounts[d]
+            dated = (credit_dates[c] >= 0) & (debit_dates[d] >= 0)
+            keep = (
+                (np.abs(offset) <= _MAX_AMOUNT_OFFSET)
+                & (~dated | (np.abs(credit_dates[c] - debit_dates[d]) <= self.DATE_TOLERANCE_DAYS))
+                & (credit_parties[c] != debit_parties[d])
+            )
+            d, c, offset = d[keep], c[keep], offset[keep].astype(np.int64) + _MAX_AMOUNT_OFFSET
+            
+            # Pairs come out grouped by debit, and each amount offset is one run
+            # of credits in statement order, so a stable sort on (debit, rank)
+            # gives every debit's matches best first
+            order = np.argsort(d * len(_AMOUNT_OFFSETS) + _OFFSET_RANK[offset], kind='stable')
+            d, c, offset = d[order], c[order], offset[order]
+            chained = _run_positions(d) < MAX_MATCHES_PER_TRANSACTION
+            forward.append(np.column_stack((d[chained], c[chained])))
+            
+            # Unchained pairs, after the spare ones from earlier (lower) debits:
+            # a stable sort on (credit, rank) keeps debits in order within a rank
+            unchained = ~chained
+            c = np.concatenate((spare_credits, c[unchained]))
+            reverse_rank = np.concatenate((spare_ranks, _OFFSET_RANK[2 * _MAX_AMOUNT_OFFSET - offset[unchained]]))
+            d = np.concatenate((spare_debits, d[unchained]))
+            order = np.argsort(c * len(_AMOUNT_OFFSETS) + reverse_rank, kind='stable')
+            c, reverse_rank, d = c[order], reverse_rank[order], d[order]
+            best = _run_positions(c) < MAX_MATCHES_PER_TRANSACTION
+            spare_credits, spare_ranks, spare_debits = c[best], reverse_rank[best], d[best]
+        
+        forward_pairs = np.concatenate(forward).tolist() if forward else []
+        reverse_pairs = np.column_stack((spare_credits, spare_debits)).tolist()
+        return forward_pairs, reverse_pairs
     
     def _is_date_proximate(self, date1: str, date2: str, max_days: int = None) -> bool:
         """Check if two dates are within tolerance."""
         if max_days is None:
             max_days = self.DATE_TOLERANCE_DAYS
         
-        try:
-            d1 = self._parse_date(date1)
-            d2 = self._parse_date(date2)
-            
-            if d1 and d2:
-                delta = abs((d1 - d2).days)
-                return delta <= max_days
-            
-            return True
-            
-        except:
-            return True
+        day1 = _date_ordinal(date1)
+        day2 = _date_ordinal(date2)
+        if day1 >= 0 and day2 >= 0:
+            return abs(day1 - day2) <= max_days
+        
+        return True
     
     def _parse_date(self, date_str: str) -> Optional[datetime]:
         """Parse date string to datetime."""
-        if not date_str:
-            return None
-        
-        formats = ['%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y', '%m/%d/%Y']
-        
-        for fmt in formats:
-            try:
-                return datetime.strptime(date_str, fmt)
-            except:
-                continue
-        
-        return None
+        return _parse_date_cached(date_str)
     
     def _build_single_chain(
         self,
         debit: Transaction,
         credit: Transaction,
-        chain_id: int,
-        visited_pairs: Set[tuple]
+        chain_id: int
     ) -> Optional[FundFlowChain]:
         """Build a single fund flow chain."""
-        pair = (id(credit), id(debit))
-        visited_pairs.add(pair)
-        
-        credit_party = credit.party or "Unknown"
-        debit_party = debit.party or "Unknown"
+        credit_party = credit.party_name
+        debit_party = debit.party_name
         
         flow_parts = [credit_party, debit_party]
         flow_path = " -> ".join(flow_parts)
@@ -327,15 +416,11 @@ class FundFlowChainBuilder:
         self,
         credit: Transaction,
         debit: Transaction,
-        chain_id: int,
-        visited_pairs: Set[tuple]
+        chain_id: int
     ) -> Optional[FundFlowChain]:
         """Build a reverse fund flow chain."""
-        pair = (id(credit), id(debit))
-        visited_pairs.add(pair)
-        
-        credit_party = credit.party or "Unknown"
-        debit_party = debit.party or "Unknown"
+        credit_party = credit.party_name
+        debit_party = debit.party_name
         
         flow_parts = [credit_party, debit_party]
         flow_path = " -> ".join(flow_parts)
@@ -375,9 +460,13 @@ class FundFlowChainBuilder:
         else:
             score -= 0.1
         
-        if self._is_date_proximate(txn1.date, txn2.date, max_days=0):
+        # Unparseable dates count as the same day, as in _is_date_proximate
+        day1 = txn1.date_ordinal
+        day2 = txn2.date_ordinal
+        date_gap = abs(day1 - day2) if day1 >= 0 and day2 >= 0 else 0
+        if date_gap == 0:
             score += 0.1
-        elif self._is_date_proximate(txn1.date, txn2.date, max_days=1):
+        elif date_gap <= 1:
             score += 0.05
         
         if txn1.is_transfer and txn2.is_transfer:
@@ -397,11 +486,10 @@ class FundFlowChainBuilder:
                 'top_chains': []
             }
         
-        total_amount = sum(c.total_amount for c in self.chains)
-        max_depth = max(c.chain_depth for c in self.chains)
-        total_cross_file = sum(c.cross_pdf_links for c in self.chains)
-        
-        sorted_chains = sorted(self.chains, key=lambda c: c.total_amount, reverse=True)
+        largest_chains = [
+            self.chains[-negative_position]
+            for _, negative_position in sorted(self._top_chain_heap, reverse=True)
+        ]
         top_chains = [
             {
                 'chain_id': c.chain_id,
@@ -409,15 +497,15 @@ class FundFlowChainBuilder:
                 'total_amount': round(c.total_amount, 2),
                 'confidence': round(c.confidence, 2)
             }
-            for c in sorted_chains[:10]
+            for c in largest_chains
         ]
         
         return {
             'total_chains': len(self.chains),
-            'total_amount': round(total_amount, 2),
-            'avg_chain_length': sum(c.chain_depth for c in self.chains) / len(self.chains),
-            'max_chain_depth': max_depth,
-            'cross_file_links': total_cross_file,
+            'total_amount': round(self._total_amount, 2),
+            'avg_chain_length': self._total_depth / len(self.chains),
+            'max_chain_depth': self._max_depth,
+            'cross_file_links': self._total_cross_file,
             'top_chains': top_chains
         }
     
@@ -426,15 +514,21 @@ class FundFlowChainBuilder:
         party_name = party_name.upper()
         paths = []
         
-        for chain in self.chains:
-            if party_name in chain.flow_path.upper():
-                paths.append({
-                    'chain_id': chain.chain_id,
-                    'flow_path': chain.flow_path,
-                    'total_amount': round(chain.total_amount, 2),
-                    'direction': 'incoming' if chain.flow_path.split(' -> ')[0].upper() == party_name else 'outgoing',
-                    'confidence': round(chain.confidence, 2)
-                })
+        # Match each distinct flow path once, then report chains in build order
+        positions = []
+        for flow_path, chain_positions in self._chain_positions_by_path.items():
+            if party_name in flow_path:
+                positions.extend(chain_positions)
+        
+        for position in sorted(positions):
+            chain = self.chains[position]
+            paths.append({
+                'chain_id': chain.chain_id,
+                'flow_path': chain.flow_path,
+                'total_amount': round(chain.total_amount, 2),
+                'direction': 'incoming' if chain.flow_path_upper.split(' -> ', 1)[0] == party_name else 'outgoing',
+                'confidence': round(chain.confidence, 2)
+            })
         
         return paths
     
@@ -442,6 +536,9 @@ class FundFlowChainBuilder:
         """Clear all data."""
         self.transactions.clear()
         self.chains.clear()
+        self._chain_positions_by_path.clear()
+        self._reset_chain_stats()
         self.party_transactions.clear()
         self.source_files.clear()
+        self._party_ids.clear()
 
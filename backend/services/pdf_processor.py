@@ -6,44 +6,71 @@ Uses multiple parsing strategies for maximum accuracy
 import pdfplumber
 import PyPDF2
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union, BinaryIO
+from functools import lru_cache
 from io import BytesIO
+from itertools import repeat
+from concurrent.futures.process import BrokenProcessPool
 import logging
 from datetime import datetime
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Maps every date separator to '/', so a matched date splits with str.split
+_DATE_SEPARATOR_TABLE = str.maketrans('-.', '//')
+
+# Pages per pool task. Every task ships the whole PDF to a worker, so pages go
+# out in runs, and statements with a single run stay in-process
+_PAGES_PER_TASK = 8
+
+
+def _compile_patterns(patterns):
+    """Compile a pattern group once; narrations are matched case-insensitively."""
+    return [re.compile(p, re.IGNORECASE) for p in patterns]
+
+
+def _keyword_re(*keywords):
+    """Compile a case-insensitive substring alternation of literal keywords."""
+    return re.compile('|'.join(map(re.escape, keywords)), re.IGNORECASE)
+
 
 class PDFProcessor:
     """Process PDF bank statements and extract transaction data"""
     
     def __init__(self):
-        self.date_patterns = [
+        self.date_patterns = [re.compile(p) for p in (
             r'\d{2}/\d{2}/\d{4}',  # DD/MM/YYYY
             r'\d{2}-\d{2}-\d{4}',  # DD-MM-YYYY
             r'\d{4}/\d{2}/\d{2}',  # YYYY/MM/DD
             r'\d{2}\.\d{2}\.\d{4}', # DD.MM.YYYY
-        ]
-        self.amount_pattern = r'[\d,]+\.?\d{0,2}'
+        )]
+        self.amount_pattern = re.compile(r'[\d,]+\.?\d{0,2}')
+        self._header_keyword_re = re.compile('date|description|narration|credit|debit|balance|amount')
+        # Every amount token starts with a digit or comma
+        self._amount_start_re = re.compile(r'[\d,]')
+        self._amount_number_re = re.compile(r'\d+\.?\d{0,2}')
         
         # ========== COMPREHENSIVE UPI PATTERNS ==========
-        self.upi_patterns = [
+        # Trailing whitespace before an end anchor is matched possessively: giving
+        # spaces back can never let $ match, it only rescans the run on every retreat
+        self.upi_patterns = _compile_patterns([
             r'UPI/(?:CR|DR)/\d+/(.+?)/(?:OK|FAIL|PA|BI|AX|PASS)',
             r'UPI/(?:CR|DR)/\d+/(.+?)$',
             r'UPI/\d+/(.+?)/(?:OK|FAIL|PA|BI)$',
             r'UPI/(.+?)/(?:OK|FAIL|PA|BI)$',
-            r'UPI-(?:CR|DR)?-?\d*-?(.+?)(?:[-/]OK|[-/]FAIL|[-/]PA|[-/]BI|$)',
-            r'UPI[-/]*(?:CR|DR)?[-/]*\d*[-/]*(.+?)(?:[-/]OK|[-/]PA|[-/]BI|$)',
+            r'UPI-(?:CR|DR)?-?\d*-?(.+?)(?:[-/](?:OK|FAIL|PA|BI)|$)',
+            r'UPI[-/]*(?:CR|DR)?[-/]*\d*[-/]*(.+?)(?:[-/](?:OK|PA|BI)|$)',
             r'@([a-zA-Z0-9]+)',
             r'UPI[/\s]*@([a-zA-Z0-9]+)',
-            r'UPI[/\s]*(?:from|to|by)[/\s]*([A-Z][A-Za-z\s]{2,})(?:\s*$|/)',
-            r'UPI/(?:D\d+)?[/\s]*([A-Z][A-Za-z\s]{2,})(?:\s*$|/)',
-            r'UPI[/\s]*(?:CR|DR)[/\s]*(?:D\d+)?[/\s]*([A-Z][A-Za-z\s]{2,})(?:\s*$)',
-            r'(?:UPI|PAYTM|GPAY|PHONEPE)[/\s]*(?:CR|DR)?[/\s]*(?:D\d+)?[/\s]*([A-Z][A-Za-z\s]+?)(?:/OKPA|/OKAX|/OKBI|/OK|/PAYPASS|$)',
-        ]
+            r'UPI[/\s]*(?:from|to|by)[/\s]*([A-Z][A-Za-z\s]{2,})(?:\s*+$|/)',
+            r'UPI/(?:D\d+)?[/\s]*([A-Z][A-Za-z\s]{2,})(?:\s*+$|/)',
+            r'UPI[/\s]*(?:CR|DR)[/\s]*(?:D\d+)?[/\s]*([A-Z][A-Za-z\s]{2,})(?:\s*+$)',
+            r'(?:UPI|PAYTM|GPAY|PHONEPE)[/\s]*(?:CR|DR)?[/\s]*(?:D\d+)?[/\s]*([A-Z][A-Za-z\s]+?)(?:/(?:OKPA|OKAX|OKBI|OK|PAYPASS)|$)',
+        ])
         
         # ========== RTGS/NEFT/IMPS PATTERNS ==========
-        self.transfer_patterns = [
+        self.transfer_patterns = _compile_patterns([
             r'RTGS\s+(?:CR|DR)?[-]?\s*(?:[A-Z0-9]+[-])?\s*([A-Z][A-Za-z\s]{2,})',
             r'NEFT\s+(?:CR|DR)?[-]?\s*(?:[A-Z0-9]+[-])?\s*([A-Z][A-Za-z\s]{2,})',
             r'IMPS\s+(?:CR|DR)?[-]?\s*(?:[A-Z0-9]+[-])?\s*([A-Z][A-Za-z\s]{2,})',
@@ -52,26 +79,57 @@ class PDFProcessor:
             r'RECEIVED\s+FROM\s+([A-Z][A-Za-z\s]{2,})',
             r'BY\s+(?:TRANSFER|NEFT|RTGS|IMPS)[:\s-]*([A-Z][A-Za-z\s]{2,})',
             r'TRF\s+(?:TO|FROM)[:\s]*([A-Z][A-Za-z\s]{2,})',
-        ]
+        ])
         
         # ========== CASH/BILL PATTERNS ==========
-        self.other_patterns = [
+        self.other_patterns = _compile_patterns([
             r'CASH\s+(?:DEPOSIT|WITHDRAWAL)\s*(?:AT|BY)?\s*([A-Z][A-Za-z\s]{2,})',
             r'(?:BILL|EMI|LOAN)\s+(?:PAYMENT|REPAYMENT)[:\s]*([A-Z][A-Za-z\s]{2,})',
             r'INSURANCE\s+(?:PREMIUM|PAYMENT)[:\s]*([A-Z][A-Za-z\s]{2,})',
             r'SALARY\s+(?:FROM|TO)?\s*([A-Z][A-Za-z\s]{2,})',
+        ])
+        
+        # Pattern groups in priority order, each gated by the keywords its patterns require
+        self.pattern_groups = [
+            (_keyword_re('UPI', '@', 'PAYTM', 'GPAY', 'PHONEPE'), self.upi_patterns),
+            (_keyword_re('RTGS', 'NEFT', 'IMPS', 'TRANSFER', 'PAID', 'RECEIVED', 'TRF'), self.transfer_patterns),
+            (_keyword_re('CASH', 'BILL', 'EMI', 'LOAN', 'INSURANCE', 'SALARY'), self.other_patterns),
         ]
+        # Every group pattern captures the party in group 1
+        assert all(p.groups >= 1 for _, patterns in self.pattern_groups for p in patterns)
+        self._non_party_words = frozenset({'DR', 'CR', 'TRF', 'BY', 'TO', 'FROM', 'PAID', 'RECEIVED'})
+        
+        # ========== FALLBACK PATTERNS ==========
+        # Patterns like "TO PARTYNAME", "FROM PARTYNAME"
+        self.advanced_patterns = _compile_patterns([
+            r'TO\s+([A-Z][A-Za-z\s]{2,})',
+            r'FOR\s+([A-Z][A-Za-z\s]{2,})',
+            r'FROM\s+([A-Z][A-Za-z\s]{2,})',
+            r'AT\s+([A-Z][A-Za-z\s]{2,})',
+        ])
+        self._advanced_prefix_re = re.compile(r'^(TO|FROM|FOR|AT|ON|BY|REF|REFNO|NO|NEW|AC|ACC)\s*')
+        # Every fallback pattern needs one of its keywords followed by whitespace
+        self._advanced_keyword_re = re.compile(r'(?:TO|FOR|FROM|AT)\s', re.IGNORECASE)
+        self._transaction_words_re = re.compile(r'\b(?:' + '|'.join((
+            'DEPOSIT', 'WITHDRAWAL', 'PAYMENT', 'TRANSFER', 'CREDIT', 'DEBIT',
+            'BALANCE', 'CHARGES', 'FEE', 'TAX', 'EMI', 'BILL', 'SALARY',
+            'INTEREST', 'DIVIDEND', 'REFUND', 'REVERSAL', 'CLEARING',
+        )) + r')\b', re.IGNORECASE)
         
         # ========== MERCHANT PATTERNS ==========
-        self.merchant_patterns = {
-            r'\buber\b': 'UBER', r'\bola\b': 'OLA', r'\bswiggy\b': 'SWIGGY',
-            r'\bzomato\b': 'ZOMATO', r'\bamazon\b': 'AMAZON', r'\bflipkart\b': 'FLIPKART',
-            r'\bmyntra\b': 'MYNTRA', r'\boyo\b': 'OYO', r'\birctc\b': 'IRCTC',
-            r'\bmakemytrip\b': 'MAKE MY TRIP', r'\bredbus\b': 'REDBUS',
-            r'\bpaytm\b': 'PAYTM', r'\bphonepe\b': 'PHONEPE', r'\bgpay\b': 'GPAY',
-            r'\bbhim\b': 'BHIM', r'\bgoogle\b': 'GOOGLE', r'\bnetflix\b': 'NETFLIX',
-            r'\bspotify\b': 'SPOTIFY', r'\bhotstar\b': 'HOTSTAR',
+        self.merchant_names = {
+            'uber': 'UBER', 'ola': 'OLA', 'swiggy': 'SWIGGY',
+            'zomato': 'ZOMATO', 'amazon': 'AMAZON', 'flipkart': 'FLIPKART',
+            'myntra': 'MYNTRA', 'oyo': 'OYO', 'irctc': 'IRCTC',
+            'makemytrip': 'MAKE MY TRIP', 'redbus': 'REDBUS',
+            'paytm': 'PAYTM', 'phonepe': 'PHONEPE', 'gpay': 'GPAY',
+            'bhim': 'BHIM', 'google': 'GOOGLE', 'netflix': 'NETFLIX',
+            'spotify': 'SPOTIFY', 'hotstar': 'HOTSTAR',
         }
+        # One scan of the lowercased narration finds every merchant word;
+        # when several appear, the one listed first above wins
+        self._merchant_re = re.compile(r'\b(?:' + '|'.join(map(re.escape, self.merchant_names)) + r')\b')
+        self._merchant_rank = {word: rank for rank, word in enumerate(self.merchant_names)}
         
         # ========== BUSINESS SUFFIXES ==========
         self.business_suffixes = [
@@ -79,17 +137,34 @@ class PDFProcessor:
             'services', 'srv', 'solutions', 'soln', 'pvt', 'ltd', 'limited',
             'corp', 'corporation', 'inc', 'company', 'co', 'group', 'associates',
         ]
+        # Business suffixes, long number sequences and special characters in one
+        # pass. The three never start on the same character, and whitespace
+        # is collapsed afterwards, so blanking them all matches removing them in turn.
+        self._name_scrub_re = re.compile(
+            r'\b(?i:' + '|'.join(map(re.escape, self.business_suffixes)) + r')\b'
+            r'|\b[\d]{10,}\b'
+            r'|[^\w\s]'
+        )
+        self._name_prefix_re = re.compile(
+            r'^(?:TO|FROM|FOR|VIA|BY|REF|REFNO|NO|NEW|AC|ACC|ACCOUNT|TRANSFER|TRF)\s*', re.IGNORECASE
+        )
+        
+        # Party extraction depends only on the narration; recurring payees repeat it verbatim
+        self._extract_party_cached = lru_cache(maxsize=65536)(self._extract_party_cached)
     
-    def extract_transactions(self, pdf_bytes: bytes) -> List[Dict[str, Any]]:
+    def extract_transactions(self, pdf_bytes: Union[bytes, BinaryIO], executor=None) -> List[Dict[str, Any]]:
         """
         Extract all transactions from PDF bank statement.
+        Accepts raw bytes or a seekable binary file object (e.g. a spooled upload).
         Uses multiple strategies to ensure accuracy and completeness.
+        With a process pool executor, the pages of a multi-page statement are
+        extracted in parallel.
         """
         transactions = []
         
         try:
             # Strategy 1: pdfplumber (best for structured tables)
-            transactions = self._extract_with_pdfplumber(pdf_bytes)
+            transactions = self._extract_with_pdfplumber(pdf_bytes, executor)
             
             # Strategy 2: PyPDF2 text extraction (fallback)
             if not transactions or len(transactions) == 0:
@@ -99,10 +174,13 @@ class PDFProcessor:
             # Validate and clean transactions
             transactions = self._validate_and_clean(transactions)
             
-            # Extract party names for all transactions
+            # Extract party names for all transactions; table rows are only
+            # resolved here, once validation has dropped the rows it rejects
             for txn in transactions:
                 if not txn.get('detected_party'):
-                    txn['detected_party'] = self._extract_party_name(txn.get('description', ''))
+                    party = self._extract_party_name(txn.get('description', ''))
+                    txn['detected_party'] = party
+                    txn.setdefault('party', party)
             
             if not transactions:
                 raise ValueError("No valid transactions extracted from PDF")
@@ -120,41 +198,33 @@ class PDFProcessor:
         """
         if not narration or len(narration) < 2:
             return None
-        
+        return self._extract_party_cached(narration)
+    
+    def _extract_party_cached(self, narration):
         narration_clean = narration.strip()
         
         party = None
         
         # ========== STEP 1: Check known merchants ==========
-        for pattern, name in self.merchant_patterns.items():
-            if re.search(pattern, narration_clean.lower()):
-                party = name
-                logger.debug(f"Merchant match: '{narration}' -> '{party}'")
-                break
+        merchant_hits = self._merchant_re.findall(narration_clean.lower())
+        if merchant_hits:
+            party = self.merchant_names[min(merchant_hits, key=self._merchant_rank.__getitem__)]
+            logger.debug(f"Merchant match: '{narration}' -> '{party}'")
         
         # ========== STEP 2: Try all pattern groups ==========
         if not party:
-            pattern_groups = [
-                self.upi_patterns,
-                self.transfer_patterns,
-                self.other_patterns,
-            ]
-            
-            for group_patterns in pattern_groups:
+            for group_re, group_patterns in self.pattern_groups:
+                # Every pattern in a group needs one of its keywords
+                if not group_re.search(narration):
+                    continue
                 for pattern in group_patterns:
-                    match = re.search(pattern, narration, re.IGNORECASE)
-                    if match:
-                        try:
-                            if match.group(1):
-                                candidate = match.group(1).upper().strip()
-                                candidate = ' '.join(candidate.split())
-                                if (len(candidate) >= 2 and 
-                                    candidate not in ['DR', 'CR', 'TRF', 'BY', 'TO', 'FROM', 'PAID', 'RECEIVED']):
-                                    party = self._normalize_party_name(candidate)
-                                    logger.debug(f"Party match: '{narration}' -> '{party}'")
-                                    break
-                        except IndexError:
-                            continue
+                    match = pattern.search(narration)
+                    if match and match.group(1):
+                        candidate = ' '.join(match.group(1).upper().split())
+                        if len(candidate) >= 2 and candidate not in self._non_party_words:
+                            party = self._normalize_party_name(candidate)
+                            logger.debug(f"Party match: '{narration}' -> '{party}'")
+                            break
                 if party:
                     break
         
@@ -169,29 +239,18 @@ class PDFProcessor:
         Advanced party extraction for complex narrations.
         """
         # Try patterns like "TO PARTYNAME", "FROM PARTYNAME"
-        patterns = [
-            r'TO\s+([A-Z][A-Za-z\s]{2,})',
-            r'FOR\s+([A-Z][A-Za-z\s]{2,})',
-            r'FROM\s+([A-Z][A-Za-z\s]{2,})',
-            r'AT\s+([A-Z][A-Za-z\s]{2,})',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, narration, re.IGNORECASE)
+        advanced_patterns = self.advanced_patterns if self._advanced_keyword_re.search(narration) else ()
+        for pattern in advanced_patterns:
+            match = pattern.search(narration)
             if match:
                 candidate = match.group(1).upper().strip()
                 candidate = ' '.join(candidate.split())
-                candidate = re.sub(r'^(TO|FROM|FOR|AT|ON|BY|REF|REFNO|NO|NEW|AC|ACC)\s*', '', candidate)
+                candidate = self._advanced_prefix_re.sub('', candidate)
                 if len(candidate) >= 2:
                     return self._normalize_party_name(candidate)
         
         # Last resort: extract meaningful words
-        transaction_words = ['DEPOSIT', 'WITHDRAWAL', 'PAYMENT', 'TRANSFER', 'CREDIT', 'DEBIT',
-                           'BALANCE', 'CHARGES', 'FEE', 'TAX', 'EMI', 'BILL', 'SALARY',
-                           'INTEREST', 'DIVIDEND', 'REFUND', 'REVERSAL', 'CLEARING']
-        cleaned = narration
-        for word in transaction_words:
-            cleaned = re.sub(r'\b' + word + r'\b', ' ', cleaned, flags=re.IGNORECASE)
+        cleaned = self._transaction_words_re.sub(' ', narration)
         
         words = cleaned.strip().split()
         meaningful = [w for w in words if len(w) > 2 and not w.isdigit()]
@@ -211,18 +270,11 @@ class PDFProcessor:
         
         name = str(name).upper().strip()
         
-        # Remove business suffixes
-        for suffix in self.business_suffixes:
-            name = re.sub(rf'\b{suffix}\b', '', name, flags=re.IGNORECASE)
-        
-        # Remove long number sequences
-        name = re.sub(r'\b[\d]{10,}\b', '', name)
-        
-        # Remove special characters
-        name = re.sub(r'[^\w\s]', ' ', name)
+        # Remove business suffixes, long number sequences and special characters
+        name = self._name_scrub_re.sub(' ', name)
         
         # Remove common prefixes
-        name = re.sub(r'^(?:TO|FROM|FOR|VIA|BY|REF|REFNO|NO|NEW|AC|ACC|ACCOUNT|TRANSFER|TRF)\s*', '', name, flags=re.IGNORECASE)
+        name = self._name_prefix_re.sub('', name)
         
         # Clean up whitespace
         name = ' '.join(name.split())
@@ -234,56 +286,90 @@ class PDFProcessor:
         
         return "UNKNOWN"
     
-    def _extract_with_pdfplumber(self, pdf_bytes: bytes) -> List[Dict[str, Any]]:
+    def _open_stream(self, pdf_bytes: Union[bytes, BinaryIO]) -> BinaryIO:
+        """Wrap raw bytes in a stream, or rewind a file object for another pass"""
+        if isinstance(pdf_bytes, (bytes, bytearray)):
+            return BytesIO(pdf_bytes)
+        pdf_bytes.seek(0)
+        return pdf_bytes
+    
+    def _extract_with_pdfplumber(self, pdf_bytes: Union[bytes, BinaryIO], executor=None) -> List[Dict[str, Any]]:
         """Extract transactions using pdfplumber (handles tables well)"""
         transactions = []
         
         try:
-            with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
-                for page_num, page in enumerate(pdf.pages):
-                    # Try to extract tables first
-                    tables = page.extract_tables()
-                    
-                    for table in tables:
-                        if not table or len(table) < 2:
-                            continue
-                        
-                        # Find header row
-                        header_row_idx = self._find_header_row(table)
-                        if header_row_idx is None:
-                            continue
-                        
-                        headers = [str(cell).strip().lower() if cell else '' for cell in table[header_row_idx]]
-                        
-                        # Process data rows
-                        for row_idx in range(header_row_idx + 1, len(table)):
-                            row = table[row_idx]
-                            if not row or all(not cell for cell in row):
-                                continue
-                            
-                            txn = self._parse_table_row(headers, row)
-                            if txn:
-                                transactions.append(txn)
-                    
-                    # If no tables found, extract text and parse
-                    if not tables:
-                        text = page.extract_text()
-                        if text:
-                            page_txns = self._parse_text_transactions(text)
-                            transactions.extend(page_txns)
+            with pdfplumber.open(self._open_stream(pdf_bytes)) as pdf:
+                page_count = len(pdf.pages)
+                pages_done = 0
+                if executor is not None and page_count > _PAGES_PER_TASK:
+                    # Pages share no state until validation, so each worker opens just its run of pages
+                    pdf_data = self._open_stream(pdf_bytes).read()
+                    runs = [
+                        list(range(start + 1, min(start + _PAGES_PER_TASK, page_count) + 1))
+                        for start in range(0, page_count, _PAGES_PER_TASK)
+                    ]
+                    try:
+                        for run, run_txns in zip(runs, executor.map(_extract_pages_in_worker, repeat(pdf_data), runs)):
+                            transactions.extend(run_txns)
+                            pages_done = run[-1]
+                    except (BrokenProcessPool, OSError) as e:
+                        # Finish the remaining pages here rather than return a truncated statement
+                        logger.warning(f"PDF page workers failed after {pages_done} pages, continuing in-process: {str(e)}")
+                
+                for page in pdf.pages[pages_done:]:
+                    transactions.extend(self._extract_page(page))
         
         except Exception as e:
             logger.warning(f"pdfplumber extraction error: {str(e)}")
         
         return transactions
     
-    def _extract_with_pypdf2(self, pdf_bytes: bytes) -> List[Dict[str, Any]]:
+    def _extract_page(self, page) -> List[Dict[str, Any]]:
+        """Extract the transactions on one pdfplumber page"""
+        transactions = []
+        
+        # Try to extract tables first
+        tables = page.extract_tables()
+        
+        for table in tables:
+            if not table or len(table) < 2:
+                continue
+            
+            # Find header row
+            header_row_idx = self._find_header_row(table)
+            if header_row_idx is None:
+                continue
+            
+            headers = [str(cell).strip().lower() if cell else '' for cell in table[header_row_idx]]
+            columns = self._find_columns(headers)
+            
+            # Process data rows
+            for row_idx in range(header_row_idx + 1, len(table)):
+                row = table[row_idx]
+                if not row or all(not cell for cell in row):
+                    continue
+                
+                txn = self._parse_table_row(columns, row)
+                if txn:
+                    transactions.append(txn)
+        
+        # If no tables found, extract text and parse
+        if not tables:
+            text = page.extract_text()
+            if text:
+                transactions.extend(self._parse_text_transactions(text))
+        
+        # pdfplumber keeps every page's parsed layout until the document closes
+        page.flush_cache()
+        
+        return transactions
+    
+    def _extract_with_pypdf2(self, pdf_bytes: Union[bytes, BinaryIO]) -> List[Dict[str, Any]]:
         """Extract transactions using PyPDF2 (text-based parsing)"""
         transactions = []
         
         try:
-            pdf_file = BytesIO(pdf_bytes)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
+            pdf_reader = PyPDF2.PdfReader(self._open_stream(pdf_bytes))
             
             for page_num, page in enumerate(pdf_reader.pages):
                 text = page.extract_text()
@@ -298,17 +384,25 @@ class PDFProcessor:
     
     def _find_header_row(self, table: List[List]) -> int:
         """Find the header row in a table"""
-        header_keywords = ['date', 'description', 'narration', 'credit', 'debit', 'balance', 'amount']
-        
         for idx, row in enumerate(table[:5]):  # Check first 5 rows
             if not row:
                 continue
             row_text = ' '.join([str(cell).lower() if cell else '' for cell in row])
-            if any(keyword in row_text for keyword in header_keywords):
+            if self._header_keyword_re.search(row_text):
                 return idx
         return 0
     
-    def _parse_table_row(self, headers: List[str], row: List) -> Dict[str, Any]:
+    def _find_columns(self, headers: List[str]) -> Dict[str, int]:
+        """Map each transaction field to its column index, once per table"""
+        return {
+            'date': self._find_column_index(headers, ['date', 'transaction date']),
+            'description': self._find_column_index(headers, ['description', 'narration', 'particulars', 'details']),
+            'credit': self._find_column_index(headers, ['credit', 'cr', 'deposit']),
+            'debit': self._find_column_index(headers, ['debit', 'dr', 'withdrawal']),
+            'balance': self._find_column_index(headers, ['balance', 'bal']),
+        }
+    
+    def _parse_table_row(self, columns: Dict[str, int], row: List) -> Dict[str, Any]:
         """Parse a table row into transaction dictionary"""
         try:
             txn = {
@@ -320,12 +414,11 @@ class PDFProcessor:
                 'detected_party': None,
             }
             
-            # Map headers to fields
-            date_idx = self._find_column_index(headers, ['date', 'transaction date'])
-            desc_idx = self._find_column_index(headers, ['description', 'narration', 'particulars', 'details'])
-            credit_idx = self._find_column_index(headers, ['credit', 'cr', 'deposit'])
-            debit_idx = self._find_column_index(headers, ['debit', 'dr', 'withdrawal'])
-            balance_idx = self._find_column_index(headers, ['balance', 'bal'])
+            date_idx = columns['date']
+            desc_idx = columns['description']
+            credit_idx = columns['credit']
+            debit_idx = columns['debit']
+            balance_idx = columns['balance']
             
             # Extract values
             if date_idx is not None and date_idx < len(row):
@@ -343,12 +436,6 @@ class PDFProcessor:
             if balance_idx is not None and balance_idx < len(row):
                 txn['balance'] = self._parse_amount(str(row[balance_idx]) if row[balance_idx] else '')
             
-            # Extract party name
-            if txn['description']:
-                party = self._extract_party_name(txn['description'])
-                txn['detected_party'] = party
-                txn['party'] = party
-            
             # Validate transaction has required fields
             if txn['date'] and txn['description']:
                 return txn
@@ -372,19 +459,23 @@ class PDFProcessor:
         lines = text.split('\n')
         
         current_txn = None
+        # Description lines of the current transaction, joined once it is saved
+        description_parts = []
         for line in lines:
             line = line.strip()
             if not line:
                 continue
             
-            # Try to find date pattern
-            date_match = re.search(self.date_patterns[0], line)
+            # Try to find date pattern; a DD/MM/YYYY date needs a slash
+            date_match = self.date_patterns[0].search(line) if '/' in line else None
             if date_match:
                 # Save previous transaction
-                if current_txn and current_txn.get('description'):
+                if current_txn and description_parts:
+                    current_txn['description'] = ' '.join(description_parts)
                     transactions.append(current_txn)
                 
                 # Start new transaction
+                description_parts = []
                 date_str = date_match.group()
                 current_txn = {
                     'date': self._parse_date(date_str),
@@ -396,8 +487,8 @@ class PDFProcessor:
                 }
                 
                 # Extract amounts from line
-                amounts = re.findall(self.amount_pattern, line)
-                amounts = [self._parse_amount(a) for a in amounts if self._parse_amount(a) > 0]
+                amounts = self.amount_pattern.findall(line)
+                amounts = [value for value in map(self._parse_amount, amounts) if value > 0]
                 
                 if len(amounts) >= 1:
                     if len(amounts) >= 2:
@@ -412,18 +503,18 @@ class PDFProcessor:
                 
                 # Extract description (text between date and amounts)
                 desc_part = line[:date_match.start()] + line[date_match.end():]
-                desc_part = re.sub(self.amount_pattern, '', desc_part).strip()
+                desc_part = self.amount_pattern.sub('', desc_part).strip()
                 if desc_part:
-                    current_txn['description'] = desc_part
+                    description_parts.append(desc_part)
                     party = self._extract_party_name(desc_part)
                     current_txn['detected_party'] = party
                     current_txn['party'] = party
             elif current_txn:
                 # Continue building description
-                amounts = re.findall(self.amount_pattern, line)
+                amounts = self.amount_pattern.findall(line) if self._amount_start_re.search(line) else None
                 if amounts:
                     # Line contains amounts, might be credit/debit/balance
-                    amounts = [self._parse_amount(a) for a in amounts if self._parse_amount(a) > 0]
+                    amounts = [value for value in map(self._parse_amount, amounts) if value > 0]
                     if amounts:
                         if not current_txn['balance']:
                             current_txn['balance'] = amounts[-1]
@@ -434,16 +525,15 @@ class PDFProcessor:
                                 current_txn['debit'] = current_txn['balance'] - amounts[0]
                 else:
                     # Continue description
-                    if current_txn['description']:
-                        current_txn['description'] += ' ' + line
-                    else:
-                        current_txn['description'] = line
+                    if not description_parts:
                         party = self._extract_party_name(line)
                         current_txn['detected_party'] = party
                         current_txn['party'] = party
+                    description_parts.append(line)
         
         # Add last transaction
-        if current_txn and current_txn.get('description'):
+        if current_txn and description_parts:
+            current_txn['description'] = ' '.join(description_parts)
             transactions.append(current_txn)
         
         return transactions
@@ -457,11 +547,11 @@ class PDFProcessor:
         
         # Try different date patterns
         for pattern in self.date_patterns:
-            match = re.search(pattern, date_str)
+            match = pattern.search(date_str)
             if match:
                 date_str = match.group()
                 # Normalize to DD/MM/YYYY
-                parts = re.split(r'[/\-\.]', date_str)
+                parts = date_str.translate(_DATE_SEPARATOR_TABLE).split('/')
                 if len(parts) == 3:
                     day, month, year = parts
                     # Handle YYYY/MM/DD format
@@ -489,8 +579,13 @@ class PDFProcessor:
                 amount_str = amount_str[1:]
                 is_negative = True
             
-            # Extract numeric value with decimal support
-            match = re.search(r'\d+\.?\d{0,2}', amount_str)
+            # Clean numbers like 1234 or 1234.50 parse directly; anything
+            # else keeps the leading number with at most two decimals
+            whole, _, fraction = amount_str.partition('.')
+            if whole.isdecimal() and (fraction.isdecimal() and len(fraction) <= 2 or not fraction):
+                value = float(amount_str)
+                return -value if is_negative else value
+            match = self._amount_number_re.search(amount_str)
             if match:
                 value = float(match.group())
                 return -value if is_negative else value
@@ -503,50 +598,48 @@ class PDFProcessor:
         """Validate and clean extracted transactions with recovery logic"""
         validated = []
         seen = set()
-        balances = []
         
-        # First pass: collect all balances for continuity validation
-        for txn in transactions:
-            balance = float(txn.get('balance', 0))
-            if balance > 0:
-                balances.append(balance)
+        # First pass: read the balance column once for continuity validation
+        balances = np.fromiter(
+            (float(txn.get('balance', 0)) for txn in transactions), dtype=np.float64, count=len(transactions)
+        )
         
         # Calculate median balance change for recovery
-        balance_changes = []
-        prev_balance = None
-        for txn in transactions:
-            balance = float(txn.get('balance', 0))
-            if balance > 0 and prev_balance is not None:
-                balance_changes.append(abs(balance - prev_balance))
-            if balance > 0:
-                prev_balance = balance
-        
-        median_change = sorted(balance_changes)[len(balance_changes) // 2] if balance_changes else 0
+        balance_changes = np.abs(np.diff(balances[balances > 0]))
+        # Upper median (the n // 2-th smallest change), found by selection rather than a full sort
+        middle = len(balance_changes) // 2
+        median_change = float(np.partition(balance_changes, middle)[middle]) if len(balance_changes) else 0
+        balances = balances.tolist()
         
         # Second pass: validate and recover transactions
         prev_balance = None
         for idx, txn in enumerate(transactions):
+            date = txn.get('date')
+            description = txn.get('description') or ''
+            credit = txn.get('credit', 0)
+            debit = txn.get('debit', 0)
+            
             # Skip duplicates
-            txn_key = (txn.get('date'), txn.get('description')[:50], round(txn.get('credit', 0), 2), round(txn.get('debit', 0), 2))
+            txn_key = (date, description[:50], round(credit, 2), round(debit, 2))
             if txn_key in seen:
                 continue
             seen.add(txn_key)
             
             # Validate required fields
-            if not txn.get('date') or not txn.get('description'):
+            if not date or not description:
                 # Try to recover date from context
-                if idx > 0 and not txn.get('date'):
+                if idx > 0 and not date:
                     prev_txn = transactions[idx - 1]
                     if prev_txn.get('date'):
                         txn['date'] = prev_txn.get('date')
                 
                 # Skip if still no date or description
-                if not txn.get('date') or not txn.get('description'):
+                if not txn.get('date') or not description:
                     continue
             
-            credit = float(txn.get('credit', 0))
-            debit = float(txn.get('debit', 0))
-            balance = float(txn.get('balance', 0))
+            credit = float(credit)
+            debit = float(debit)
+            balance = balances[idx]
             
             # Recovery logic: if both credit and debit are 0, try to infer from balance
             if credit == 0 and debit == 0:
@@ -565,7 +658,7 @@ class PDFProcessor:
                     debit = median_change
                 else:
                     # Last resort: try regex extraction from description
-                    amount_str = re.search(r'[\d,]+\.?\d{0,2}', txn.get('description', ''))
+                    amount_str = self.amount_pattern.search(txn.get('description', ''))
                     if amount_str:
                         recovered_amount = self._parse_amount(amount_str.group())
                         if recovered_amount > 0:
@@ -576,8 +669,8 @@ class PDFProcessor:
             if txn.get('credit', 0) == 0 and txn.get('debit', 0) == 0:
                 # Still zero? Use regex fallback on description
                 desc = str(txn.get('description', ''))
-                amounts = re.findall(self.amount_pattern, desc)
-                amounts = [self._parse_amount(a) for a in amounts if self._parse_amount(a) > 0]
+                amounts = self.amount_pattern.findall(desc)
+                amounts = [value for value in map(self._parse_amount, amounts) if value > 0]
                 if amounts:
                     # Use largest amount found in description
                     recovered_amount = max(amounts)
@@ -623,3 +716,17 @@ class PDFProcessor:
         logger.info(f"Validated {len(validated)} transactions (recovered {len(validated) - len(transactions) + len([t for t in transactions if t.get('date') and t.get('description')])} missing amounts)")
         return validated
 
+
+_worker_processor = None
+
+
+def _extract_pages_in_worker(pdf_data: bytes, page_numbers: List[int]) -> List[Dict[str, Any]]:
+    """Extract a run of pages of a statement in a pool worker, reusing a per-process PDFProcessor."""
+    global _worker_processor
+    if _worker_processor is None:
+        _worker_processor = PDFProcessor()
+    transactions = []
+    with pdfplumber.open(BytesIO(pdf_data), pages=page_numbers) as pdf:
+        for page in pdf.pages:
+            transactions.extend(_worker_processor._extract_page(page))
+    return transactions
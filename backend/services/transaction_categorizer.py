@@ -4,7 +4,8 @@ Uses NLP-based classification to categorize transactions
 """
 
 import re
-from typing import Dict, Any, List
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,6 +16,34 @@ class TransactionCategorizer:
     def __init__(self):
         self.category_patterns = self._build_category_patterns()
         self.merchant_risk_keywords = self._build_risk_keywords()
+        # Category patterns are literal words joined by '.*'; a pattern can only
+        # match when every one of its pieces occurs in the description.
+        # Per category: (compiled pattern, length, pieces, is literal, confidence);
+        # a longer matching pattern gives a more confident narration match
+        self._category_matchers = [
+            (cat_key, [
+                (re.compile(pattern, re.IGNORECASE), len(pattern),
+                 frozenset(pattern.split('.*')), '.*' not in pattern,
+                 round(min(0.95, 0.5 + (len(pattern) / 100)), 3))
+                for pattern in patterns
+            ])
+            for cat_key, patterns in self.category_patterns.items()
+        ]
+        assert all(re.fullmatch(r'[a-z ]+(?:\.\*[a-z ]+)*', p)
+                   for patterns in self.category_patterns.values() for p in patterns)
+        self._category_keywords = frozenset().union(*(
+            matcher[2] for _, matchers in self._category_matchers for matcher in matchers
+        ))
+        # One alternation per risk tier, checked in tier order (high wins over
+        # medium even when a medium keyword appears earlier in the text)
+        self._risk_tiers = [
+            (re.compile('|'.join(self.merchant_risk_keywords[tier])), score)
+            for tier, score in (('high_risk', 0.9), ('medium_risk', 0.6), ('low_risk', 0.2))
+        ]
+        
+        # Both scans depend only on the description; statements repeat them heavily
+        self._match_category = lru_cache(maxsize=65536)(self._match_category)
+        self._calculate_merchant_risk = lru_cache(maxsize=65536)(self._calculate_merchant_risk)
     
     def _build_category_patterns(self) -> Dict[str, List[str]]:
         """Build pattern dictionaries for transaction categorization"""
@@ -88,11 +117,14 @@ class TransactionCategorizer:
         Categorize a single transaction and return category metadata.
         Returns: category, subcategory, merchant_risk_score, narration_risk_confidence, behavioral_deviation
         """
-        description = str(transaction.get('description', '')).lower()
-        credit = float(transaction.get('credit', 0.0))
-        debit = float(transaction.get('debit', 0.0))
-        amount = credit if credit > 0 else debit
-        
+        return self._categorize_row(
+            str(transaction.get('description', '')).lower(),
+            float(transaction.get('credit', 0.0)),
+            float(transaction.get('debit', 0.0))
+        )
+    
+    def _categorize_row(self, description: str, credit: float, debit: float) -> Dict[str, Any]:
+        """Categorize from an already lowercased description and float amounts"""
         # Initialize defaults
         category = 'Unknown'
         subcategory = ''
@@ -100,17 +132,8 @@ class TransactionCategorizer:
         narration_risk_confidence = 0.5
         behavioral_deviation = 'Normal'
         
-        # Categorize based on patterns
-        matched_category = None
-        max_match_length = 0
-        
-        for cat_key, patterns in self.category_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, description, re.IGNORECASE):
-                    if len(pattern) > max_match_length:
-                        max_match_length = len(pattern)
-                        matched_category = cat_key
-                        break
+        # Categorize based on patterns; confidence reflects the pattern match quality
+        matched_category, narration_risk_confidence = self._match_category(description)
         
         if matched_category:
             # Use matched category directly (no subcategory splitting for new categories)
@@ -128,49 +151,53 @@ class TransactionCategorizer:
         # Calculate merchant risk score
         merchant_risk_score = self._calculate_merchant_risk(description)
         
-        # Calculate narration risk confidence (based on pattern match quality)
-        if matched_category:
-            narration_risk_confidence = min(0.95, 0.5 + (max_match_length / 100))
-        else:
-            narration_risk_confidence = 0.3
-        
         # Determine behavioral deviation
-        behavioral_deviation = self._determine_behavioral_deviation(transaction, category)
+        behavioral_deviation = self._determine_behavioral_deviation(credit or debit, category)
         
         return {
             'category': category,
             'subcategory': subcategory,
-            'merchant_risk_score': round(merchant_risk_score, 3),
-            'narration_risk_confidence': round(narration_risk_confidence, 3),
+            'merchant_risk_score': merchant_risk_score,
+            'narration_risk_confidence': narration_risk_confidence,
             'behavioral_deviation': behavioral_deviation
         }
     
-    def _calculate_merchant_risk(self, description: str) -> float:
-        """Calculate merchant risk score (0.0 to 1.0)"""
-        description_lower = description.lower()
+    def _match_category(self, description: str) -> Tuple[Optional[str], float]:
+        """Return the matched category (or None) and its narration confidence"""
+        matched_category = None
+        max_match_length = 0
+        confidence = 0.3
         
-        # Check high risk keywords
-        for keyword in self.merchant_risk_keywords.get('high_risk', []):
-            if re.search(keyword, description_lower):
-                return 0.9
+        # Scan for all keywords in one pass and skip patterns missing a piece.
+        # Only for ASCII text: IGNORECASE also folds e.g. 'ſ' to 's'.
+        present = ({kw for kw in self._category_keywords if kw in description}
+                   if description.isascii() else None)
         
-        # Check medium risk keywords
-        for keyword in self.merchant_risk_keywords.get('medium_risk', []):
-            if re.search(keyword, description_lower):
-                return 0.6
+        for cat_key, matchers in self._category_matchers:
+            for pattern_re, pattern_length, pieces, is_literal, pattern_confidence in matchers:
+                if present is not None and not present.issuperset(pieces):
+                    continue
+                # On ASCII text a literal pattern whose keyword is present has matched
+                if (present is not None and is_literal) or pattern_re.search(description):
+                    if pattern_length > max_match_length:
+                        max_match_length = pattern_length
+                        matched_category = cat_key
+                        confidence = pattern_confidence
+                        break
         
-        # Check low risk keywords
-        for keyword in self.merchant_risk_keywords.get('low_risk', []):
-            if re.search(keyword, description_lower):
-                return 0.2
+        return matched_category, confidence
+    
+    def _calculate_merchant_risk(self, description_lower: str) -> float:
+        """Calculate merchant risk score (0.0 to 1.0) from a lowercased description"""
+        for tier_re, score in self._risk_tiers:
+            if tier_re.search(description_lower):
+                return score
         
         # Default medium risk
         return 0.5
     
-    def _determine_behavioral_deviation(self, transaction: Dict[str, Any], category: str) -> str:
-        """Determine behavioral deviation tag"""
-        amount = float(transaction.get('credit', 0.0)) or float(transaction.get('debit', 0.0))
-        
+    def _determine_behavioral_deviation(self, amount: float, category: str) -> str:
+        """Determine behavioral deviation tag (amount is credit, or debit when credit is 0)"""
         # Large amounts might indicate deviation
         if amount > 100000:  # Threshold for large transactions
             return 'High Value'
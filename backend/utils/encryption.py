@@ -2,15 +2,21 @@
 Encryption utilities for financial data protection
 """
 
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, InvalidToken
 import base64
+import binascii
 import os
 import logging
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Fernet tokens are already URL-safe base64 ("gAAAAA..."). Older values were
+# base64-encoded a second time, which turns that prefix into "Z0FBQUFB".
+_LEGACY_TOKEN_PREFIX = "Z0FBQUFB"
+
 def get_encryption_key() -> bytes:
     """Get or generate encryption key"""
     key = os.getenv("ENCRYPTION_KEY")
@@ -22,25 +28,33 @@ def get_encryption_key() -> bytes:
         key = key.encode() if isinstance(key, str) else key
     return key
 
+def _build_fernet() -> Optional[Fernet]:
+    """Validate the key and build the Fernet instance; None if the key is unusable"""
+    try:
+        return Fernet(get_encryption_key())
+    except ValueError as e:
+        logger.error(f"Invalid ENCRYPTION_KEY, data will not be encrypted: {str(e)}")
+        return None
+
+# Built once at import so a bad key shows up at startup, not on first use
+_fernet = _build_fernet()
+
 def encrypt_data(data: str) -> str:
     """Encrypt sensitive data"""
-    try:
-        key = get_encryption_key()
-        f = Fernet(key)
-        encrypted = f.encrypt(data.encode())
-        return base64.b64encode(encrypted).decode()
-    except Exception as e:
-        # For prototype, return data as-is if encryption fails
+    if _fernet is None:
+        # For prototype, return data as-is without a usable key
         return data
+    return _fernet.encrypt(data.encode()).decode()
 
 def decrypt_data(encrypted_data: str) -> str:
     """Decrypt sensitive data"""
+    if _fernet is None:
+        return encrypted_data
+    token = encrypted_data.encode()
     try:
-        key = get_encryption_key()
-        f = Fernet(key)
-        decrypted = f.decrypt(base64.b64decode(encrypted_data.encode()))
-        return decrypted.decode()
-    except Exception as e:
-        # For prototype, return data as-is if decryption fails
+        if encrypted_data.startswith(_LEGACY_TOKEN_PREFIX):
+            token = base64.b64decode(token)
+        return _fernet.decrypt(token).decode()
+    except (InvalidToken, binascii.Error):
+        # Not a token for this key (e.g. data stored unencrypted); return as-is
         return encrypted_data
-